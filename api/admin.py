@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import User, Municipio, Estado, Aluno, CustomUserManager
+from .models import User, Municipio, Estado, Aluno, CustomUserManager, EmailPendente
 
 
 @admin.register(Estado)
@@ -54,3 +54,11 @@ class AlunoAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email', 'cpf')
     list_filter = ('sexo', 'naturalidade', 'cidade')
 
+
+@admin.register(EmailPendente)
+class EmailPendenteAdmin(admin.ModelAdmin):
+    """Admin para acompanhar a caixa de saída de e-mails."""
+    list_display = ('assunto', 'status', 'tentativas', 'proxima_tentativa', 'criado_em', 'enviado_em')
+    list_filter = ('status',)
+    search_fields = ('assunto', 'destinatarios')
+    readonly_fields = ('criado_em', 'enviado_em')
@@ -0,0 +1,100 @@
+import hashlib
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from api.models import ConteudoArquivo, Documento
+
+
+def calcular_sha256(arquivo):
+    """SHA-256 de um arquivo lido em blocos (para arquivos que não passaram pelo DocumentoUploadHandler)."""
+    sha256 = hashlib.sha256()
+    for bloco in arquivo.chunks():
+        sha256.update(bloco)
+    arquivo.seek(0)
+    return sha256.hexdigest()
+
+
+@contextmanager
+def transacao_com_arquivos():
+    """
+    transaction.atomic() para gravar conteúdos novos: entrega a lista que
+    armazenar_conteudos preenche e, se a transação não for confirmada, apaga
+    esses arquivos do storage (o banco volta atrás, o disco não). Deve ser a
+    transação mais externa; dentro de outra, um rollback posterior deixaria
+    os arquivos órfãos.
+    """
+    novos = []
+    try:
+        with transaction.atomic():
+            yield novos
+    except BaseException:
+        for arquivo in novos:
+            arquivo.storage.delete(arquivo.name)
+        raise
+
+
+def armazenar_conteudos(arquivos, novos=None):
+    """
+    Guarda cada arquivo uma única vez por conteúdo e soma as referências.
+    Conteúdos já conhecidos não são gravados de novo (o upload é descartado);
+    os novos vão para documentos/<hash> e entram em 'novos' (ver
+    transacao_com_arquivos). Retorna os ConteudoArquivo na ordem de 'arquivos'.
+    Deve rodar na transação que cria os Documentos.
+    """
+    if novos is None:
+        novos = []
+    hashes = [getattr(arquivo, 'sha256', '') or calcular_sha256(arquivo) for arquivo in arquivos]
+    quantidades = Counter(hashes)
+    with transaction.atomic():
+        conteudos = {
+            conteudo.sha256: conteudo
+            for conteudo in ConteudoArquivo.objects.select_for_update().filter(sha256__in=list(quantidades))
+        }
+        for arquivo, sha256 in zip(arquivos, hashes):
+            if sha256 in conteudos:
+                continue
+            conteudo = ConteudoArquivo(sha256=sha256, tamanho=arquivo.size, referencias=0)
+            conteudo.arquivo.save(arquivo.name, arquivo, save=False)
+            novos.append(conteudo.arquivo)
+            try:
+                with transaction.atomic():
+                    conteudo.save()
+            except IntegrityError:
+                # Outro upload do mesmo conteúdo chegou antes: usa o dele
+                novos.remove(conteudo.arquivo)
+                conteudo.arquivo.delete(save=False)
+                conteudo = ConteudoArquivo.objects.select_for_update().get(sha256=sha256)
+            conteudos[sha256] = conteudo
+
+        for sha256, quantidade in quantidades.items():
+            ConteudoArquivo.objects.filter(pk=conteudos[sha256].pk).update(referencias=F('referencias') + quantidade)
+    return [conteudos[sha256] for sha256 in hashes]
+
+
+def liberar_conteudos(conteudo_ids):
+    """
+    Tira uma referência de cada id (repetidos contam várias vezes). Conteúdos que
+    ficam sem referências são apagados, e o arquivo sai do storage depois do commit.
+    """
+    quantidades = Counter(conteudo_ids)
+    if not quantidades:
+        return
+    with transaction.atomic():
+        for conteudo_id, quantidade in quantidades.items():
+            ConteudoArquivo.objects.filter(pk=conteudo_id).update(
+                referencias=Greatest(F('referencias') - quantidade, 0)
+            )
+        orfaos = list(ConteudoArquivo.objects.select_for_update().filter(pk__in=list(quantidades), referencias__lte=0))
+        if not orfaos:
+            return
+        ConteudoArquivo.objects.filter(pk__in=[conteudo.pk for conteudo in orfaos]).delete()
+        for conteudo in orfaos:
+            # Documentos antigos ainda não deduplicados podem usar o mesmo caminho
+            if not Documento.objects.filter(arquivo=conteudo.arquivo.name).exists():
+                transaction.on_commit(lambda arquivo=conteudo.arquivo: arquivo.storage.delete(arquivo.name))
+            if conteudo.preview:
+                transaction.on_commit(lambda preview=conteudo.preview: preview.storage.delete(preview.name))
@@ -0,0 +1,104 @@
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_etags
+
+TAMANHO_BLOCO = 64 * 1024
+RE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _intervalo(request, tamanho, etag):
+    """
+    Lê o cabeçalho Range. Só um intervalo 'bytes=a-b' (ou 'a-', ou '-n') é
+    atendido; pedidos com vários intervalos recebem o arquivo inteiro, como a
+    RFC 9110 permite. Retorna None (arquivo inteiro), (inicio, fim) ou 'invalido'.
+    Range malformado (ex.: 'bytes=5-3') é ignorado; 'invalido' (416) é só para
+    um intervalo bem formado que fica fora do arquivo.
+    """
+    cabecalho = request.META.get('HTTP_RANGE')
+    if not cabecalho:
+        return None
+    # If-Range com outra versão do arquivo: manda o arquivo inteiro
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and etag not in parse_etags(if_range):
+        return None
+    encontrado = RE_RANGE.match(cabecalho.strip())
+    if not encontrado or encontrado.groups() == ('', ''):
+        return None
+    inicio, fim = encontrado.groups()
+    if inicio == '':
+        # Últimos n bytes
+        if int(fim) == 0 or tamanho == 0:
+            return 'invalido'
+        return max(tamanho - int(fim), 0), tamanho - 1
+    inicio = int(inicio)
+    if fim and int(fim) < inicio:
+        return None
+    if inicio >= tamanho:
+        return 'invalido'
+    return inicio, min(int(fim), tamanho - 1) if fim else tamanho - 1
+
+
+def _trecho(arquivo, inicio, quantidade):
+    try:
+        arquivo.seek(inicio)
+        while quantidade > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, quantidade))
+            if not bloco:
+                break
+            quantidade -= len(bloco)
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+def resposta_arquivo(request, arquivo, nome, content_type='', etag=None, modificado_em=None, anexo=True):
+    """
+    Resposta de download de um FieldFile já autorizado pela view:
+    - If-None-Match/If-Modified-Since -> 304, If-Match/If-Unmodified-Since -> 412;
+    - DOCUMENTOS_ENVIO='x-accel-redirect' (nginx) ou 'x-sendfile' (Apache/lighttpd):
+      só os cabeçalhos saem do Django e o servidor web envia os bytes (e trata Range);
+    - senão, o arquivo inteiro vai por FileResponse (sendfile do servidor WSGI quando
+      disponível) e um Range de um intervalo vira 206 Partial Content.
+    'etag' já deve vir entre aspas; anexo=False mostra o arquivo no navegador (inline).
+    """
+    ultima_modificacao = modificado_em.timestamp() if modificado_em else None
+    nao_modificado = get_conditional_response(request, etag=etag, last_modified=ultima_modificacao)
+    if nao_modificado is not None:
+        return nao_modificado
+
+    content_type = content_type or 'application/octet-stream'
+    envio = settings.DOCUMENTOS_ENVIO
+    if envio in ('x-accel-redirect', 'x-sendfile'):
+        resposta = HttpResponse(content_type=content_type)
+        if envio == 'x-accel-redirect':
+            resposta['X-Accel-Redirect'] = settings.DOCUMENTOS_ACCEL_PREFIXO + arquivo.name
+        else:
+            resposta['X-Sendfile'] = arquivo.path
+    else:
+        tamanho = arquivo.size
+        intervalo = _intervalo(request, tamanho, etag)
+        if intervalo == 'invalido':
+            resposta = HttpResponse(status=416)
+            resposta['Content-Range'] = f'bytes */{tamanho}'
+            return resposta
+        if intervalo is None:
+            resposta = FileResponse(arquivo.storage.open(arquivo.name, 'rb'), content_type=content_type)
+        else:
+            inicio, fim = intervalo
+            resposta = StreamingHttpResponse(
+                _trecho(arquivo.storage.open(arquivo.name, 'rb'), inicio, fim - inicio + 1), status=206, content_type=content_type
+            )
+            resposta['Content-Length'] = str(fim - inicio + 1)
+            resposta['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+        resposta['Accept-Ranges'] = 'bytes'
+
+    resposta['Content-Disposition'] = content_disposition_header(anexo, nome)
+    resposta['Cache-Control'] = 'private, no-cache'
+    if etag:
+        resposta['ETag'] = etag
+    if ultima_modificacao:
+        resposta['Last-Modified'] = http_date(ultima_modificacao)
+    return resposta
@@ -0,0 +1,116 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import EmailPendente
+
+logger = logging.getLogger(__name__)
+
+StatusEnvio = EmailPendente.StatusEnvio
+
+
+def montar_email(assunto, mensagem, destinatarios, mensagem_html='', remetente=None):
+    """Monta (sem salvar) um e-mail da caixa de saída, para uso com bulk_create."""
+    return EmailPendente(
+        assunto=assunto,
+        mensagem=mensagem,
+        mensagem_html=mensagem_html,
+        # EMAIL_HOST_USER pode não estar definido (ex.: SMTP sem autenticação)
+        remetente=remetente or settings.EMAIL_HOST_USER or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+
+
+def enfileirar_email(assunto, mensagem, destinatarios, mensagem_html='', remetente=None):
+    """
+    Grava o e-mail na caixa de saída. É só um INSERT: a requisição não espera o SMTP.
+    """
+    email = montar_email(assunto, mensagem, destinatarios, mensagem_html, remetente)
+    email.save()
+    return email
+
+
+def _reservar_lote(tamanho):
+    """
+    Reserva até 'tamanho' e-mails pendentes para este worker, empurrando a
+    próxima tentativa para frente (EMAIL_FILA_RESERVA). SKIP LOCKED permite
+    vários workers; se um deles morrer, os e-mails voltam após a reserva expirar.
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            EmailPendente.objects.select_for_update(skip_locked=True)
+            .filter(status=StatusEnvio.PENDENTE, proxima_tentativa__lte=agora)
+            .order_by('proxima_tentativa')[:tamanho]
+        )
+        if emails:
+            EmailPendente.objects.filter(pk__in=[e.pk for e in emails]).update(
+                proxima_tentativa=agora + timedelta(seconds=settings.EMAIL_FILA_RESERVA)
+            )
+    return emails
+
+
+def _espera_nova_tentativa(tentativas):
+    """Backoff exponencial: 30s, 60s, 120s... limitado a EMAIL_FILA_ESPERA_MAXIMA."""
+    return timedelta(seconds=min(30 * 2 ** (tentativas - 1), settings.EMAIL_FILA_ESPERA_MAXIMA))
+
+
+def enviar_pendentes(tamanho_lote=100):
+    """
+    Envia um lote da caixa de saída usando UMA conexão com o servidor de e-mail.
+    Falhas são reagendadas com backoff até EMAIL_FILA_MAX_TENTATIVAS.
+    Retorna (enviados, falhas).
+    """
+    emails = _reservar_lote(tamanho_lote)
+    if not emails:
+        return 0, 0
+
+    enviados = falhas = 0
+    conexao = get_connection(fail_silently=False)
+    try:
+        conexao.open()
+        erro_conexao = None
+    except Exception as e:
+        erro_conexao = e
+
+    try:
+        for email in emails:
+            try:
+                if erro_conexao is not None:
+                    raise erro_conexao
+                mensagem = EmailMultiAlternatives(
+                    subject=email.assunto,
+                    body=email.mensagem,
+                    from_email=email.remetente or None,
+                    to=email.destinatarios,
+                    connection=conexao,
+                )
+                if email.mensagem_html:
+                    mensagem.attach_alternative(email.mensagem_html, 'text/html')
+                mensagem.send()
+            except Exception as e:
+                falhas += 1
+                email.tentativas += 1
+                email.ultimo_erro = str(e)
+                if email.tentativas >= settings.EMAIL_FILA_MAX_TENTATIVAS:
+                    email.status = StatusEnvio.FALHOU
+                    logger.error(f'E-mail {email.pk} descartado após {email.tentativas} tentativas: {e}')
+                else:
+                    email.proxima_tentativa = timezone.now() + _espera_nova_tentativa(email.tentativas)
+            else:
+                enviados += 1
+                email.tentativas += 1
+                email.status = StatusEnvio.ENVIADO
+                email.enviado_em = timezone.now()
+    finally:
+        if erro_conexao is None:
+            conexao.close()
+
+    EmailPendente.objects.bulk_update(
+        emails, ['status', 'tentativas', 'proxima_tentativa', 'ultimo_erro', 'enviado_em']
+    )
+    return enviados, falhas
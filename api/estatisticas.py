@@ -0,0 +1,65 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from api.models import EstatisticaInscricao, InscricaoAluno
+
+
+def ajustar_estatisticas(deltas):
+    """
+    Soma os deltas {(curso_id, status, tipo_vaga): n} aos totais, com um UPDATE
+    por linha (total = total + n). As linhas são atualizadas sempre na mesma
+    ordem, para duas transações concorrentes não se travarem.
+    Deltas negativos em linhas inexistentes são ignorados (ex.: curso sendo
+    apagado em cascata); a diferença, se houver, é corrigida pelo comando
+    'reconstruir_estatisticas'.
+    """
+    with transaction.atomic():
+        for (curso_id, status, tipo_vaga), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            linha = EstatisticaInscricao.objects.filter(curso_id=curso_id, status=status, tipo_vaga=tipo_vaga)
+            if linha.update(total=Greatest(F('total') + delta, 0)) or delta < 0:
+                continue
+            _, criada = EstatisticaInscricao.objects.get_or_create(
+                curso_id=curso_id, status=status, tipo_vaga=tipo_vaga, defaults={'total': delta}
+            )
+            if not criada:
+                linha.update(total=F('total') + delta)
+
+
+def registrar_transicoes(transicoes):
+    """
+    Atualiza as estatísticas para mudanças de status feitas com UPDATE em lote.
+    'transicoes' produz (curso_id, tipo_vaga, status_anterior, status_novo).
+    """
+    deltas = Counter()
+    for curso_id, tipo_vaga, anterior, novo in transicoes:
+        if anterior != novo:
+            deltas[(curso_id, anterior, tipo_vaga)] -= 1
+            deltas[(curso_id, novo, tipo_vaga)] += 1
+    if deltas:
+        ajustar_estatisticas(deltas)
+
+
+def reconstruir_estatisticas(curso_ids=None):
+    """
+    Recalcula as estatísticas contando as inscrições (GROUP BY curso, status,
+    tipo_vaga), em uma transação. Sem 'curso_ids', recalcula todos os cursos.
+    Retorna quantas linhas foram gravadas.
+    """
+    inscricoes = InscricaoAluno.objects.order_by()
+    estatisticas = EstatisticaInscricao.objects.all()
+    if curso_ids is not None:
+        inscricoes = inscricoes.filter(curso_id__in=curso_ids)
+        estatisticas = estatisticas.filter(curso_id__in=curso_ids)
+
+    with transaction.atomic():
+        contagens = list(inscricoes.values('curso_id', 'status', 'tipo_vaga').annotate(total=Count('id')))
+        estatisticas.delete()
+        EstatisticaInscricao.objects.bulk_create(
+            [EstatisticaInscricao(**contagem) for contagem in contagens], batch_size=1000
+        )
+    return len(contagens)
@@ -0,0 +1,158 @@
+import csv
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+# Linhas por bloco enviado ao cliente
+LINHAS_POR_BLOCO = 500
+# Caracteres que fazem o Excel/LibreOffice interpretar a célula como fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _celula_segura(valor):
+    """Evita injeção de fórmula em planilhas (nomes e e-mails vêm dos usuários)."""
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def gerar_csv(cabecalho, linhas):
+    """
+    Gera o CSV em blocos de texto, sem montar o arquivo na memória.
+    Usa ';' e BOM UTF-8, que é como o Excel em português abre CSV corretamente.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=';')
+    buffer.write('\ufeff')
+    escritor.writerow(cabecalho)
+    for numero, linha in enumerate(linhas, start=1):
+        escritor.writerow([_celula_segura(valor) for valor in linha])
+        if numero % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _SaidaZip:
+    """
+    Destino do ZipFile sem seek/tell: o zipfile passa a gravar em modo streaming
+    (data descriptors) e os bytes já prontos são retirados com pop().
+    """
+    def __init__(self):
+        self._blocos = []
+
+    def write(self, dados):
+        self._blocos.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        dados = b''.join(self._blocos)
+        self._blocos.clear()
+        return dados
+
+
+def gerar_zip(entradas):
+    """
+    Gera um arquivo ZIP em blocos. 'entradas' produz (nome no zip, iterável de
+    blocos de bytes, comprimir); cada entrada é lida e enviada aos poucos.
+    """
+    saida = _SaidaZip()
+    with zipfile.ZipFile(saida, 'w') as arquivo_zip:
+        for nome, blocos, comprimir in entradas:
+            info = zipfile.ZipInfo(nome)
+            info.compress_type = zipfile.ZIP_DEFLATED if comprimir else zipfile.ZIP_STORED
+            with arquivo_zip.open(info, 'w', force_zip64=True) as destino:
+                for bloco in blocos:
+                    destino.write(bloco)
+                    dados = saida.pop()
+                    if dados:
+                        yield dados
+            yield saida.pop()
+    yield saida.pop()
+
+
+def nome_seguro(nome, padrao='arquivo'):
+    """Nome utilizável como pasta/arquivo dentro do ZIP (sem barras nem caracteres de controle)."""
+    nome = ''.join(' ' if c in '/\\' or ord(c) < 32 else c for c in str(nome)).strip(' .')
+    return nome[:150] or padrao
+
+
+# --- XLSX mínimo (SpreadsheetML) escrito à mão, com strings inline ---
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nome}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _linha_xlsx(valores):
+    celulas = []
+    for valor in valores:
+        if valor is None or valor == '':
+            celulas.append('<c/>')
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            celulas.append(f'<c><v>{valor}</v></c>')
+        else:
+            celulas.append(f'<c t="inlineStr"><is><t>{escape(str(valor))}</t></is></c>')
+    return '<row>' + ''.join(celulas) + '</row>'
+
+
+def _planilha_xlsx(cabecalho, linhas):
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>',
+        _linha_xlsx(cabecalho),
+    ]
+    for numero, linha in enumerate(linhas, start=1):
+        partes.append(_linha_xlsx(linha))
+        if numero % LINHAS_POR_BLOCO == 0:
+            yield ''.join(partes).encode('utf-8')
+            partes.clear()
+    partes.append('</sheetData></worksheet>')
+    yield ''.join(partes).encode('utf-8')
+
+
+def gerar_xlsx(cabecalho, linhas, nome_planilha='Planilha1'):
+    """Gera um .xlsx de uma planilha em blocos (as linhas são lidas uma vez, em ordem)."""
+    entradas = [
+        ('[Content_Types].xml', [_CONTENT_TYPES.encode()], True),
+        ('_rels/.rels', [_RELS.encode()], True),
+        ('xl/workbook.xml', [_WORKBOOK.format(nome=escape(nome_planilha[:31])).encode()], True),
+        ('xl/_rels/workbook.xml.rels', [_WORKBOOK_RELS.encode()], True),
+        ('xl/worksheets/sheet1.xml', _planilha_xlsx(cabecalho, linhas), True),
+    ]
+    return gerar_zip(entradas)
@@ -0,0 +1,121 @@
+import bisect
+import threading
+import unicodedata
+
+from api.referencia import versao_referencia
+
+# Quantidade padrão de sugestões devolvidas pelo autocomplete
+LIMITE_PADRAO = 20
+
+
+def normalizar(texto):
+    """
+    Remove acentos e diferença entre maiúsculas/minúsculas: 'São Paulo' -> 'sao paulo'.
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acento.casefold().split())
+
+
+class _Escopo:
+    """
+    Índices de um conjunto de municípios (todos, ou os de um estado).
+    - 'nomes': nomes normalizados em ordem, para busca por prefixo com bisect.
+    - 'palavras': sufixos que começam em cada palavra do nome ('paulo' em
+      'sao paulo'), para achar 'paulo' sem varrer a lista.
+    """
+    def __init__(self, entradas):
+        self.entradas = sorted(entradas, key=lambda e: (e[0], e[2]['nome']))
+        self.nomes = [e[0] for e in self.entradas]
+        palavras = []
+        for posicao, (chave, _, _) in enumerate(self.entradas):
+            inicio = chave.find(' ')
+            while inicio != -1:
+                palavras.append((chave[inicio + 1:], posicao))
+                inicio = chave.find(' ', inicio + 1)
+        palavras.sort()
+        self.palavras = palavras
+        self.chaves_palavras = [p[0] for p in palavras]
+
+
+def _faixa_prefixo(chaves, prefixo):
+    inicio = bisect.bisect_left(chaves, prefixo)
+    fim = bisect.bisect_left(chaves, prefixo + '\uffff', lo=inicio)
+    return range(inicio, fim)
+
+
+class IndiceMunicipios:
+    """
+    Índice em memória (por processo) dos municípios para o autocomplete.
+    A busca ignora acentos e caixa e ordena os resultados por relevância:
+    nome exato, começo do nome, começo de uma palavra e, por último, trecho
+    no meio do nome; dentro de cada grupo, capitais primeiro e depois ordem alfabética.
+    """
+    def __init__(self, municipios):
+        """'municipios': dicts serializados por MunicipioSerializer, com 'capital'."""
+        entradas = [(normalizar(m['nome']), m.pop('capital'), m) for m in municipios]
+        self.todos = _Escopo(entradas)
+        por_estado = {}
+        for entrada in entradas:
+            por_estado.setdefault(entrada[2]['estado']['id'], []).append(entrada)
+        self.estados = {estado_id: _Escopo(lista) for estado_id, lista in por_estado.items()}
+
+    def buscar(self, termo=None, estado_id=None, limite=LIMITE_PADRAO):
+        escopo = self.todos if estado_id is None else self.estados.get(estado_id)
+        if escopo is None:
+            return []
+
+        termo = normalizar(termo or '')
+        if not termo:
+            return [e[2] for e in escopo.entradas[:limite]]
+
+        ranqueados = {}
+        for posicao in _faixa_prefixo(escopo.nomes, termo):
+            ranqueados[posicao] = 0 if escopo.nomes[posicao] == termo else 1
+        for indice in _faixa_prefixo(escopo.chaves_palavras, termo):
+            ranqueados.setdefault(escopo.palavras[indice][1], 2)
+        if len(ranqueados) < limite:
+            # Último recurso: trecho no meio de uma palavra ('ortal' em 'fortaleza')
+            for posicao, chave in enumerate(escopo.nomes):
+                if posicao not in ranqueados and termo in chave:
+                    ranqueados[posicao] = 3
+
+        ordem = sorted(
+            ranqueados.items(),
+            key=lambda item: (item[1], not escopo.entradas[item[0]][1], item[0]),
+        )
+        return [escopo.entradas[posicao][2] for posicao, _ in ordem[:limite]]
+
+
+_indice = None
+_versao = None
+_lock = threading.Lock()
+
+
+def obter_indice():
+    """
+    Devolve o índice do processo, reconstruindo-o quando a versão dos dados de
+    referência muda (import_data, ou alteração de Estado/Município pelo admin).
+    """
+    global _indice, _versao
+    versao = versao_referencia()
+    if _indice is None or _versao != versao:
+        with _lock:
+            if _indice is None or _versao != versao:
+                _indice = _construir_indice()
+                _versao = versao
+    return _indice
+
+
+def _construir_indice():
+    # Import local: o serializer importa os models, que não podem ser carregados
+    # antes do registro dos apps.
+    from api.models import Municipio
+    from api.serializer import MunicipioSerializer
+
+    class MunicipioIndiceSerializer(MunicipioSerializer):
+        class Meta(MunicipioSerializer.Meta):
+            fields = MunicipioSerializer.Meta.fields + ['capital']
+
+    municipios = Municipio.objects.select_related('estado').order_by()
+    return IndiceMunicipios(MunicipioIndiceSerializer(municipios, many=True).data)
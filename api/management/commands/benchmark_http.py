@@ -0,0 +1,85 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga simples de uma URL: N clientes concorrentes (conexões keep-alive) '
+        'durante alguns segundos. Usado para comparar o runserver com o gunicorn (ver Readme).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Ex.: http://localhost:8000/cursos/')
+        parser.add_argument('--concorrencia', type=int, default=16, help='Clientes simultâneos (padrão: 16).')
+        parser.add_argument('--duracao', type=float, default=15, help='Segundos de medição (padrão: 15).')
+        parser.add_argument('--aquecimento', type=float, default=2, help='Segundos antes de medir (padrão: 2).')
+        parser.add_argument('--token', help='Access token JWT (enviado como "Authorization: Bearer").')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise CommandError('Informe uma URL http:// ou https:// completa.')
+        caminho = url.path or '/'
+        if url.query:
+            caminho += '?' + url.query
+        cabecalhos = {'Accept': 'application/json'}
+        if options['token']:
+            cabecalhos['Authorization'] = f"Bearer {options['token']}"
+
+        inicio_medicao = time.monotonic() + options['aquecimento']
+        fim = inicio_medicao + options['duracao']
+        latencias, erros, status_http = [], [0], {}
+        trava = threading.Lock()
+
+        def cliente():
+            classe = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+            conexao = classe(url.hostname, url.port, timeout=30)
+            minhas, meus_erros, meus_status = [], 0, {}
+            while (agora := time.monotonic()) < fim:
+                try:
+                    conexao.request('GET', caminho, headers=cabecalhos)
+                    resposta = conexao.getresponse()
+                    resposta.read()
+                    codigo = resposta.status
+                    if resposta.getheader('Connection', '').lower() == 'close':
+                        conexao.close()
+                except (OSError, http.client.HTTPException):
+                    conexao.close()
+                    codigo = None
+                if agora >= inicio_medicao:
+                    minhas.append(time.monotonic() - agora)
+                    if codigo is None:
+                        meus_erros += 1
+                    else:
+                        meus_status[codigo] = meus_status.get(codigo, 0) + 1
+            conexao.close()
+            with trava:
+                latencias.extend(minhas)
+                erros[0] += meus_erros
+                for codigo, quantidade in meus_status.items():
+                    status_http[codigo] = status_http.get(codigo, 0) + quantidade
+
+        threads = [threading.Thread(target=cliente) for _ in range(options['concorrencia'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not latencias:
+            raise CommandError('Nenhuma requisição foi concluída durante a medição.')
+        latencias.sort()
+
+        def percentil(p):
+            return latencias[min(int(len(latencias) * p), len(latencias) - 1)] * 1000
+
+        self.stdout.write(f"{options['url']} - {options['concorrencia']} cliente(s), {options['duracao']:.0f}s")
+        self.stdout.write(f'  requisições: {len(latencias)} ({len(latencias) / options["duracao"]:.1f}/s)')
+        self.stdout.write(f'  status HTTP: {dict(sorted(status_http.items()))}, erros de conexão: {erros[0]}')
+        self.stdout.write(
+            f'  latência (ms): p50 {percentil(0.50):.1f}  p95 {percentil(0.95):.1f}  '
+            f'p99 {percentil(0.99):.1f}  máx {latencias[-1] * 1000:.1f}'
+        )
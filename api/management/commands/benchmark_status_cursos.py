@@ -0,0 +1,88 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Curso
+from api.status_cursos import atualizar_status
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o filtro por status gravado com o status efetivo calculado na leitura. '
+        'Os cursos de teste são criados dentro de uma transação desfeita no final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursos', type=int, default=100_000, help='Cursos de teste (padrão: 100000).')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Execuções de cada consulta (padrão: 20).')
+        parser.add_argument('--atraso', type=float, default=24, help='Horas de atraso simulado do agendador (padrão: 24).')
+        parser.add_argument('--explain', action='store_true', help='Mostra o plano de cada consulta.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.executar(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Cursos de teste descartados.')
+
+    def executar(self, options):
+        agora = timezone.now()
+        self.criar_cursos(options['cursos'], agora - timedelta(hours=options['atraso']))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Curso._meta.db_table}')
+
+        consultas = {
+            'status gravado': Curso.objects.filter(status=Curso.StatusChoices.INSCRICOES_ABERTAS),
+            'status_efetivo (CASE)': Curso.objects.com_status_efetivo(agora).filter(
+                status_efetivo=Curso.StatusChoices.INSCRICOES_ABERTAS
+            ),
+            'com_inscricoes_abertas': Curso.objects.com_inscricoes_abertas(agora),
+        }
+        self.stdout.write(f"{'consulta':<26}{'cursos':>8}{'mediana (ms)':>15}{'mínimo (ms)':>14}")
+        for nome, consulta in consultas.items():
+            # Mesma forma da primeira página do catálogo: ids ordenados pelo cursor
+            consulta = consulta.order_by('nome', 'id').values_list('id', flat=True)
+            tempos = []
+            for _ in range(options['repeticoes']):
+                inicio = time.perf_counter()
+                total = len(list(consulta.all()))  # .all(): sem o cache do queryset
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            tempos.sort()
+            self.stdout.write(f'{nome:<26}{total:>8}{tempos[len(tempos) // 2]:>15.2f}{tempos[0]:>14.2f}')
+            if options['explain']:
+                self.stdout.write(consulta.explain())
+
+    def criar_cursos(self, quantidade, ultima_execucao):
+        """Cursos com datas espalhadas em volta de hoje e status gravado pela última execução do agendador."""
+        hoje = timezone.localdate()
+        cursos = []
+        for i in range(quantidade):
+            inicio_inscricoes = timezone.now() + timedelta(days=random.uniform(-120, 60))
+            inicio_curso = inicio_inscricoes.date() + timedelta(days=random.randint(5, 40))
+            curso = Curso(
+                nome=f'Curso de teste {i:06d}',
+                descricao='-', descricao_curta='-', carga_horaria=40,
+                data_inicio_inscricoes=inicio_inscricoes,
+                data_fim_inscricoes=inicio_inscricoes + timedelta(days=5),
+                data_inicio_curso=inicio_curso,
+                data_fim_curso=inicio_curso + timedelta(days=random.randint(10, 90)),
+                status=Curso.StatusChoices.CANCELADO if random.random() < 0.02 else Curso.StatusChoices.AGENDADO,
+            )
+            atualizar_status(curso, ultima_execucao)
+            cursos.append(curso)
+        inicio = time.perf_counter()
+        Curso.objects.bulk_create(cursos, batch_size=5000)
+        self.stdout.write(
+            f'{quantidade} cursos criados em {time.perf_counter() - inicio:.1f}s '
+            f'(hoje: {hoje}, status gravado em {ultima_execucao:%Y-%m-%d %H:%M}).'
+        )
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.template.defaultfilters import filesizeformat
+
+from api.documentos import calcular_sha256
+from api.models import ConteudoArquivo, Documento
+
+
+class Command(BaseCommand):
+    help = (
+        'Liga os documentos antigos ao armazenamento por conteúdo (SHA-256), '
+        'apagando as cópias repetidas e informando o espaço recuperado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só calcula o que seria feito, sem alterar nada.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Documentos lidos por consulta (padrão: 500).')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        dry_run = options['dry_run']
+        processados = novos = duplicados = ausentes = 0
+        recuperado = 0
+        vistos = {}  # sha256 -> caminho (no dry-run, os conteúdos "criados" não vão para o banco)
+
+        pendentes = Documento.objects.filter(conteudo__isnull=True).order_by('id')
+        for documento in pendentes.iterator(chunk_size=options['batch_size']):
+            storage = documento.arquivo.storage
+            caminho = documento.arquivo.name
+            if not caminho or not storage.exists(caminho):
+                ausentes += 1
+                self.stdout.write(self.style.WARNING(f'  Documento {documento.pk}: arquivo "{caminho}" não encontrado.'))
+                continue
+
+            processados += 1
+            tamanho = storage.size(caminho)
+            sha256 = documento.sha256
+            if not sha256:
+                with storage.open(caminho, 'rb') as arquivo:
+                    sha256 = calcular_sha256(arquivo)
+
+            if dry_run:
+                if sha256 in vistos or ConteudoArquivo.objects.filter(sha256=sha256).exists():
+                    duplicados += 1
+                    recuperado += tamanho
+                else:
+                    novos += 1
+                vistos.setdefault(sha256, caminho)
+                continue
+
+            with transaction.atomic():
+                conteudo = ConteudoArquivo.objects.select_for_update().filter(sha256=sha256).first()
+                if conteudo is None:
+                    # Primeira cópia deste conteúdo: o arquivo atual vira o conteúdo, sem mover nada
+                    conteudo = ConteudoArquivo.objects.create(
+                        sha256=sha256, arquivo=caminho, tamanho=tamanho, referencias=1
+                    )
+                    novos += 1
+                else:
+                    ConteudoArquivo.objects.filter(pk=conteudo.pk).update(referencias=F('referencias') + 1)
+                    duplicados += 1
+
+                Documento.objects.filter(pk=documento.pk).update(
+                    conteudo=conteudo, arquivo=conteudo.arquivo.name, sha256=sha256, tamanho=tamanho
+                )
+                # A cópia repetida sai do disco se nenhum outro documento ainda usa este caminho
+                if caminho != conteudo.arquivo.name and not Documento.objects.filter(arquivo=caminho).exists():
+                    recuperado += tamanho
+                    transaction.on_commit(lambda caminho=caminho: storage.delete(caminho))
+
+        prefixo = '[DRY-RUN] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefixo}{processados} documento(s) processado(s): {novos} conteúdo(s) único(s), '
+            f'{duplicados} cópia(s) repetida(s), {ausentes} arquivo(s) ausente(s). '
+            f'Espaço recuperado: {filesizeformat(recuperado)} ({time.perf_counter() - inicio:.1f}s).'
+        ))
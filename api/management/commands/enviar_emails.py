@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.emails import enviar_pendentes
+from api.notificacoes import processar_notificacoes
+
+
+class Command(BaseCommand):
+    help = 'Gera os avisos de inscrição e envia os e-mails da caixa de saída (EmailPendente) em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='E-mails por conexão SMTP (padrão: 100).')
+        parser.add_argument('--loop', action='store_true', help='Fica rodando como worker.')
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera quando a fila está vazia, no modo --loop (padrão: 5).'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                # Primeiro transforma os eventos de inscrição em e-mails (um por aluno)
+                while True:
+                    eventos, gerados = processar_notificacoes()
+                    if not eventos:
+                        break
+                    self.stdout.write(f'{eventos} evento(s) de inscrição -> {gerados} e-mail(s).')
+
+                total_enviados = total_falhas = 0
+                # Esvazia o que estiver pronto para envio, um lote (e uma conexão) por vez
+                while True:
+                    enviados, falhas = enviar_pendentes(options['lote'])
+                    total_enviados += enviados
+                    total_falhas += falhas
+                    if enviados + falhas < options['lote']:
+                        break
+
+                if total_enviados or total_falhas:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{total_enviados} e-mail(s) enviado(s), {total_falhas} falha(s).'
+                    ))
+                if not options['loop']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write('Worker de e-mails encerrado.')
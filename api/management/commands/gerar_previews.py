@@ -0,0 +1,76 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from api.models import ConteudoArquivo
+from api.previews import gerar_preview
+
+logger = logging.getLogger(__name__)
+
+StatusPreview = ConteudoArquivo.StatusPreview
+
+
+class Command(BaseCommand):
+    help = 'Gera os previews (miniaturas) dos documentos enviados, em um pool de processos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=os.cpu_count() or 2, help='Processos de geração (padrão: nº de CPUs).')
+        parser.add_argument('--lote', type=int, default=50, help='Documentos por rodada (padrão: 50).')
+        parser.add_argument('--loop', action='store_true', help='Fica rodando como worker.')
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera quando não há previews pendentes, no modo --loop (padrão: 5).'
+        )
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['processos']) as pool:
+            try:
+                while True:
+                    while self.processar_lote(pool, options['lote']) == options['lote']:
+                        pass
+                    if not options['loop']:
+                        break
+                    time.sleep(options['intervalo'])
+            except KeyboardInterrupt:
+                self.stdout.write('Gerador de previews encerrado.')
+
+    def processar_lote(self, pool, tamanho):
+        """Gera os previews de um lote em paralelo. Retorna quantos conteúdos foram processados."""
+        pendentes = list(
+            ConteudoArquivo.objects.filter(status_preview=StatusPreview.PENDENTE)
+            .order_by('id').only('id', 'sha256', 'arquivo', 'preview')[:tamanho]
+        )
+        if not pendentes:
+            return 0
+
+        inicio = time.perf_counter()
+        resultados = pool.map(gerar_preview, [conteudo.arquivo.path for conteudo in pendentes])
+        contagem = {status: 0 for status in StatusPreview.values}
+        for conteudo, (jpeg, erro) in zip(pendentes, resultados):
+            if jpeg:
+                conteudo.preview.save(conteudo.sha256, ContentFile(jpeg), save=False)
+                campos = {'preview': conteudo.preview.name, 'status_preview': StatusPreview.PRONTO}
+            elif erro:
+                logger.error(f'Falha ao gerar o preview do conteúdo {conteudo.pk}: {erro}')
+                campos = {'status_preview': StatusPreview.FALHOU}
+            else:
+                campos = {'status_preview': StatusPreview.SEM_PREVIEW}
+
+            # Condicional: se o conteúdo foi apagado ou outro worker já gerou, descarta o arquivo
+            atualizados = ConteudoArquivo.objects.filter(
+                pk=conteudo.pk, status_preview=StatusPreview.PENDENTE
+            ).update(**campos)
+            if not atualizados and jpeg:
+                conteudo.preview.delete(save=False)
+            contagem[campos['status_preview']] += atualizados
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(pendentes)} documento(s): {contagem[StatusPreview.PRONTO]} preview(s), "
+            f"{contagem[StatusPreview.SEM_PREVIEW]} sem preview, {contagem[StatusPreview.FALHOU]} falha(s) "
+            f"({time.perf_counter() - inicio:.1f}s)."
+        ))
+        return len(pendentes)
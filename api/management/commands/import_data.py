@@ -1,54 +1,127 @@
-import os
-import json
-import csv
-import xml.etree.ElementTree as ET
+import time
+from decimal import Decimal
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from django.utils import timezone
-from datetime import datetime
 from api.models import (
     Estado, Municipio
 )
-from django.utils.dateparse import parse_datetime
+from api.referencia import invalidar_referencia
+from api.streaming import em_lotes, iterar_array_json
+
+COORDENADA = Decimal('0.000001')
 
 
+def coordenada(valor):
+    # Mesmo arredondamento do DecimalField (6 casas), para comparar com o banco
+    return None if valor is None else Decimal(str(valor)).quantize(COORDENADA)
+
 
 class Command(BaseCommand):
     help = 'Importa dados de estados e municípios'
 
-    def handle(self, *args, **kwargs):
-        self.carregarEstados()
-        self.carregarMunicipios()
-        pass
-
-    def carregarEstados(self):
-        with open('/app/assets/estados.json') as f:
-            estados_data = json.load(f)
-            for estado_data in estados_data:
-                Estado.objects.get_or_create(
-                    id = estado_data['ID'],
-                    id_ibge = estado_data['id_ibge'],
+    def add_arguments(self, parser):
+        parser.add_argument('--estados', default='/app/assets/estados.json', help='Arquivo JSON de estados.')
+        parser.add_argument('--cidades', default='/app/assets/cidades.json', help='Arquivo JSON de municípios.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Registros por lote de upsert (padrão: 1000).')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas compara os arquivos com o banco e mostra o que seria inserido/alterado.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            self.carregarEstados(options['estados'])
+            self.carregarMunicipios(options['cidades'])
+
+        if not self.dry_run:
+            # Os endpoints de estados/municípios passam a servir (e versionar) os novos dados
+            invalidar_referencia()
+        self.stdout.write(f'Tempo total: {time.perf_counter() - inicio:.2f}s')
+
+    def carregarEstados(self, caminho):
+        with open(caminho) as f:
+            estados = (
+                Estado(
+                    id=int(estado_data['ID']),
+                    id_ibge=estado_data['id_ibge'],
                     nome=estado_data['Nome'],
                     uf=estado_data['Sigla'],
                     regiao=estado_data['Regiao'],
                     pais='Brasil',
-                    latitude=estado_data['Latitude'],
-                    longitude=estado_data['Longitude']
+                    latitude=coordenada(estado_data['Latitude']),
+                    longitude=coordenada(estado_data['Longitude']),
                 )
+                for estado_data in iterar_array_json(f)
+            )
+            self.upsert('Estados', Estado, estados, ['id_ibge', 'nome', 'uf', 'regiao', 'pais', 'latitude', 'longitude'])
 
-        self.stdout.write(self.style.SUCCESS('Estados importados com sucesso.'))
-
-    def carregarMunicipios(self):
-        with open('/app/assets/cidades.json') as f:
-            municipios_data = json.load(f)
-            for municipio_data in municipios_data:
-                estado = Estado.objects.filter(id=municipio_data['estado']).first()
-                Municipio.objects.get_or_create(
-                    id = municipio_data['ID'],
-                    codigo_ibge = municipio_data['id_ibge'],
+    def carregarMunicipios(self, caminho):
+        # O arquivo é lido em streaming e gravado em lotes de --batch-size:
+        # o consumo de memória não cresce com o tamanho do arquivo.
+        with open(caminho) as f:
+            municipios = (
+                Municipio(
+                    id=int(municipio_data['ID']),
+                    codigo_ibge=municipio_data['id_ibge'],
                     nome=municipio_data['nome'],
-                    estado_id=municipio_data['estado'],
-                    capital=municipio_data['capital']
+                    estado_id=int(municipio_data['estado']),
+                    capital=municipio_data['capital'],
+                )
+                for municipio_data in iterar_array_json(f)
+            )
+            self.upsert('Municípios', Municipio, municipios, ['nome', 'estado', 'codigo_ibge', 'capital'])
+
+    def upsert(self, rotulo, model, objetos, campos):
+        """
+        Insere ou atualiza 'objetos' em lotes: para cada lote, uma consulta traz
+        os registros já existentes e um único INSERT ... ON CONFLICT (id) DO UPDATE
+        grava apenas os novos e os alterados. Registros idênticos não são reescritos.
+        """
+        inicio = time.perf_counter()
+        atributos = [model._meta.get_field(campo).attname for campo in campos]
+        novos = alterados = inalterados = 0
+
+        for lote in em_lotes(objetos, self.batch_size):
+            existentes = {
+                linha[0]: linha[1:]
+                for linha in model.objects.filter(pk__in=[obj.pk for obj in lote]).values_list('pk', *atributos)
+            }
+            pendentes = []
+            for obj in lote:
+                valores = tuple(getattr(obj, atributo) for atributo in atributos)
+                atual = existentes.get(obj.pk)
+                if atual is None:
+                    novos += 1
+                elif atual != valores:
+                    alterados += 1
+                else:
+                    inalterados += 1
+                    continue
+                pendentes.append(obj)
+                if self.dry_run and self.verbosity >= 2:
+                    acao = 'novo' if atual is None else 'alterado'
+                    self.stdout.write(f'  [{acao}] {model.__name__} {obj.pk}: {dict(zip(campos, valores))}')
+
+            if pendentes and not self.dry_run:
+                model.objects.bulk_create(
+                    pendentes,
+                    update_conflicts=True,
+                    unique_fields=['id'],
+                    update_fields=campos,
                 )
 
-        self.stdout.write(self.style.SUCCESS('Municípios importados com sucesso.'))
+        resumo = (
+            f'{rotulo}: {novos} novo(s), {alterados} alterado(s), {inalterados} inalterado(s) '
+            f'em {time.perf_counter() - inicio:.2f}s'
+        )
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING(f'[dry-run] {resumo}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(resumo))
+
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from api.estatisticas import reconstruir_estatisticas
+from api.models import EstatisticaInscricao, InscricaoAluno
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula a tabela de estatísticas de inscrições (por curso, status e tipo de vaga) '
+        'a partir das inscrições, informando as diferenças encontradas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', type=int, action='append', dest='cursos', help='Só este curso (pode repetir).')
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra as diferenças, sem alterar nada.')
+
+    def handle(self, *args, **options):
+        cursos = options['cursos']
+        inscricoes = InscricaoAluno.objects.order_by()
+        estatisticas = EstatisticaInscricao.objects.order_by()
+        if cursos:
+            inscricoes = inscricoes.filter(curso_id__in=cursos)
+            estatisticas = estatisticas.filter(curso_id__in=cursos)
+
+        chave = ('curso_id', 'status', 'tipo_vaga')
+        contadas = {
+            tuple(linha[campo] for campo in chave): linha['total']
+            for linha in inscricoes.values(*chave).annotate(total=Count('id'))
+        }
+        gravadas = {
+            tuple(linha[campo] for campo in chave): linha['total']
+            for linha in estatisticas.values(*chave, 'total')
+        }
+        diferencas = sorted(
+            (c, gravadas.get(c, 0), contadas.get(c, 0))
+            for c in contadas.keys() | gravadas.keys() if gravadas.get(c, 0) != contadas.get(c, 0)
+        )
+        for (curso_id, status, tipo_vaga), gravado, contado in diferencas:
+            self.stdout.write(self.style.WARNING(
+                f'  Curso {curso_id} {status}/{tipo_vaga}: {gravado} na tabela, {contado} inscrições.'
+            ))
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(diferencas)} diferença(s) encontrada(s). Nada foi alterado (--dry-run).')
+            return
+        linhas = reconstruir_estatisticas(cursos)
+        self.stdout.write(self.style.SUCCESS(
+            f'Estatísticas recalculadas: {linhas} linha(s), {len(diferencas)} diferença(s) corrigida(s).'
+        ))
@@ -1,41 +1,55 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from api.models import Curso # Importe seu modelo Curso
+
+from api.models import Curso
+from api.status_cursos import aplicar_transicoes, proxima_transicao_agendada, reconciliar
+
 
 class Command(BaseCommand):
     help = 'Verifica e atualiza o status dos cursos com base nas datas atuais'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Fica rodando e acorda quando vence a próxima transição de status.'
+        )
+        parser.add_argument(
+            '--espera-maxima', type=float, default=60,
+            help='Máximo de segundos dormindo no modo --loop, para enxergar cursos novos (padrão: 60).'
+        )
+
     def handle(self, *args, **options):
         now = timezone.now()
-        today = now.date()
         self.stdout.write(f"[{now.strftime('%Y-%m-%d %H:%M')}] Iniciando verificação de status dos cursos...")
 
-        # --- LÓGICA 1: De AGENDADO para INSCRIÇÕES ABERTAS ---
-        cursos_para_abrir = Curso.objects.filter(
-            status=Curso.StatusChoices.AGENDADO,
-            data_inicio_inscricoes__lte=now
-        )
-        count_abertos = cursos_para_abrir.update(status=Curso.StatusChoices.INSCRICOES_ABERTAS)
-        if count_abertos:
-            self.stdout.write(self.style.SUCCESS(f'  -> {count_abertos} curso(s) tiveram suas inscrições abertas.'))
-
-        # --- LÓGICA 2: De INSCRIÇÕES ABERTAS para EM ANDAMENTO ---
-        # Um curso começa quando sua data de início chega E as inscrições já estavam abertas.
-        cursos_para_iniciar = Curso.objects.filter(
-            status=Curso.StatusChoices.INSCRICOES_ABERTAS,
-            data_inicio_curso__lte=today
-        )
-        count_iniciados = cursos_para_iniciar.update(status=Curso.StatusChoices.EM_ANDAMENTO)
-        if count_iniciados:
-            self.stdout.write(self.style.SUCCESS(f'  -> {count_iniciados} curso(s) entraram em andamento.'))
-            
-        # --- LÓGICA 3: De EM ANDAMENTO para FINALIZADO ---
-        cursos_para_finalizar = Curso.objects.filter(
-            status=Curso.StatusChoices.EM_ANDAMENTO,
-            data_fim_curso__lt=today
-        )
-        count_finalizados = cursos_para_finalizar.update(status=Curso.StatusChoices.FINALIZADO)
-        if count_finalizados:
-            self.stdout.write(self.style.SUCCESS(f'  -> {count_finalizados} curso(s) foram finalizados.'))
+        # Cursos sem agendamento (ou com agendamento desatualizado) primeiro
+        self.relatar(reconciliar())
+
+        try:
+            while True:
+                self.relatar(aplicar_transicoes())
+                if not options['loop']:
+                    break
+
+                proxima = proxima_transicao_agendada()
+                espera = options['espera_maxima']
+                if proxima is not None:
+                    espera = min(espera, max((proxima - timezone.now()).total_seconds(), 0))
+                time.sleep(espera)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write("Verificação concluída.")
 
-        self.stdout.write("Verificação concluída.")
\ No newline at end of file
+    def relatar(self, mudancas):
+        mensagens = {
+            Curso.StatusChoices.INSCRICOES_ABERTAS: 'tiveram suas inscrições abertas',
+            Curso.StatusChoices.EM_ANDAMENTO: 'entraram em andamento',
+            Curso.StatusChoices.FINALIZADO: 'foram finalizados',
+        }
+        for novo_status, quantidade in mudancas.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'  -> {quantidade} curso(s) {mensagens.get(novo_status, f"passaram para {novo_status}")}.'
+            ))
@@ -1,4 +1,8 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
 class CustomUserManager(BaseUserManager):
     """
@@ -34,4 +38,98 @@ class CustomUserManager(BaseUserManager):
         if extra_fields.get('is_superuser') is not True:
             raise ValueError('Superusuário deve ter is_superuser=True.')
 
-        return self._create_user(email, password, **extra_fields)
\ No newline at end of file
+        return self._create_user(email, password, **extra_fields)
+
+class ProfessorQuerySet(models.QuerySet):
+    """
+    QuerySet de Professor com os caminhos de leitura usados pelos serializers.
+    """
+    def com_detalhes(self):
+        """
+        Carrega tudo o que o ProfessorSerializer precisa em um número fixo de
+        consultas: usuário (e perfil de aluno, usado em 'perfil_completo'),
+        grupos, cursos criados e o total de cursos como anotação.
+        """
+        Curso = self.model._meta.get_field('cursos_criados').related_model
+        return self.select_related('user', 'user__perfil_aluno').prefetch_related(
+            'user__groups',
+            Prefetch('cursos_criados', queryset=Curso.objects.only('id', 'nome', 'status', 'criador_id')),
+        ).annotate(total_cursos=Count('cursos_criados', distinct=True))
+
+
+class CursoQuerySet(models.QuerySet):
+    """
+    QuerySet de Curso com os caminhos de leitura usados pelos serializers.
+    """
+    def com_detalhes(self):
+        """
+        Pré-carrega o criador com o mesmo plano de consultas de
+        ProfessorQuerySet.com_detalhes, para que a listagem de cursos faça
+        sempre o mesmo número de consultas, independente da quantidade de cursos.
+        """
+        Professor = self.model._meta.get_field('criador').related_model
+        return self.prefetch_related(Prefetch('criador', queryset=Professor.objects.com_detalhes()))
+
+    def com_status_efetivo(self, agora=None):
+        """
+        Anota 'status_efetivo': o status que o curso tem agora pelas datas, com as
+        mesmas regras de api/status_cursos.py, sem depender do agendador ter rodado.
+        Pode ser usado em filter()/order_by() como qualquer coluna.
+        """
+        agora = agora or timezone.now()
+        hoje = timezone.localdate(agora)
+        Status = self.model.StatusChoices
+
+        abriu = Q(data_inicio_inscricoes__lte=agora)
+        comecou = Q(data_inicio_curso__lte=hoje)
+        terminou = Q(data_fim_curso__lt=hoje)
+        em_andamento = (
+            Q(status=Status.EM_ANDAMENTO)
+            | Q(status=Status.INSCRICOES_ABERTAS) & comecou
+            | Q(status=Status.AGENDADO) & abriu & comecou
+        )
+        return self.annotate(status_efetivo=Case(
+            When(status__in=[Status.FINALIZADO, Status.CANCELADO], then=F('status')),
+            When(em_andamento & terminou, then=Value(Status.FINALIZADO)),
+            When(em_andamento, then=Value(Status.EM_ANDAMENTO)),
+            When(Q(status=Status.INSCRICOES_ABERTAS) | Q(status=Status.AGENDADO) & abriu,
+                 then=Value(Status.INSCRICOES_ABERTAS)),
+            default=Value(Status.AGENDADO),
+            output_field=self.model._meta.get_field('status'),
+        ))
+
+    def com_vagas_restantes(self):
+        """
+        Anota 'vagas_internas_restantes' e 'vagas_externas_restantes' a partir dos
+        contadores de vagas (VagaCurso), os mesmos que a reserva usa (ver
+        api/vagas.py): capacidade - ocupadas, em subconsultas na mesma consulta dos
+        cursos. Curso ainda sem contador tem todas as vagas livres; inscrições 'NI'
+        ocupam o contador EXTERNO.
+        """
+        VagaCurso = self.model._meta.get_field('contadores_vagas').related_model
+        TipoVaga = self.model._meta.get_field('inscricaoaluno').related_model.TipoVaga
+
+        def restantes(grupo, vagas):
+            livres = VagaCurso.objects.filter(curso=OuterRef('pk'), tipo_vaga=grupo).values(
+                livres=Greatest(F('capacidade') - F('ocupadas'), 0, output_field=IntegerField())
+            )
+            return Coalesce(Subquery(livres), F(vagas), output_field=IntegerField())
+
+        return self.annotate(
+            vagas_internas_restantes=restantes(TipoVaga.INTERNO, 'vagas_internas'),
+            vagas_externas_restantes=restantes(TipoVaga.EXTERNO, 'vagas_externas'),
+        )
+
+    def com_inscricoes_abertas(self, agora=None):
+        """
+        Equivalente a com_status_efetivo().filter(status_efetivo=INSCRIÇÕES ABERTAS),
+        mas escrito só com comparações de colunas, para usar os índices
+        (status, data_inicio_inscricoes) e (status, data_inicio_curso).
+        """
+        agora = agora or timezone.now()
+        Status = self.model.StatusChoices
+        return self.filter(
+            Q(status=Status.INSCRICOES_ABERTAS)
+            | Q(status=Status.AGENDADO, data_inicio_inscricoes__lte=agora),
+            data_inicio_curso__gt=timezone.localdate(agora),
+        )
@@ -0,0 +1,56 @@
+import os
+
+from django.db import connection
+
+
+def _modo(banco):
+    if banco['OPTIONS'].get('pool'):
+        return 'pool'
+    if banco['CONN_MAX_AGE'] != 0:
+        return 'persistente'
+    return 'por requisição'
+
+
+def metricas_conexoes():
+    """
+    Ocupação das conexões com o banco:
+    - 'pool': estatísticas do pool deste processo (psycopg_pool.get_stats(): tamanho,
+      conexões livres, requisições esperando, tempo de espera...). Cada worker do
+      gunicorn tem o seu pool, então os números variam conforme o worker que responde;
+    - 'postgres': conexões abertas no banco por estado (pg_stat_activity), de todos
+      os processos, comparadas com o max_connections do servidor.
+    """
+    banco = connection.settings_dict
+    dados = {
+        'banco': connection.vendor,
+        'modo': _modo(banco),
+        'conn_max_age': banco['CONN_MAX_AGE'],
+        'conn_health_checks': banco['CONN_HEALTH_CHECKS'],
+        'processo': os.getpid(),
+    }
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        dados['pool'] = {'config': banco['OPTIONS']['pool'], **pool.get_stats()}
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('max_connections')::int, "
+                "current_setting('superuser_reserved_connections')::int"
+            )
+            maximo, reservadas = cursor.fetchone()
+            cursor.execute(
+                'SELECT state, count(*) FROM pg_stat_activity '
+                'WHERE datname = current_database() GROUP BY state'
+            )
+            por_estado = {estado or 'sem estado': total for estado, total in cursor.fetchall()}
+        abertas = sum(por_estado.values())
+        disponiveis = maximo - reservadas
+        dados['postgres'] = {
+            'max_connections': maximo,
+            'reservadas_superusuario': reservadas,
+            'conexoes_abertas': abertas,
+            'por_estado': por_estado,
+            'ocupacao': round(abertas / disponiveis, 4) if disponiveis else None,
+        }
+    return dados
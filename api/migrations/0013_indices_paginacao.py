@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_inscricaoaluno_matricula'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['nome', 'id'], name='curso_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricaoaluno',
+            index=models.Index(fields=['data_inscricao', 'id'], name='inscricao_data_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricaoaluno',
+            index=models.Index(fields=['curso', 'data_inscricao', 'id'], name='inscricao_curso_data_id_idx'),
+        ),
+    ]
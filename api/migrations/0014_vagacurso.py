@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VagaCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_vaga', models.CharField(choices=[('INTERNO', 'Interno'), ('EXTERNO', 'Externo'), ('NI', 'ni')], max_length=10)),
+                ('capacidade', models.PositiveIntegerField()),
+                ('ocupadas', models.PositiveIntegerField(default=0)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contadores_vagas', to='api.curso')),
+            ],
+            options={
+                'verbose_name': 'Contador de Vagas',
+                'verbose_name_plural': 'Contadores de Vagas',
+                'unique_together': {('curso', 'tipo_vaga')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+OCUPAM_VAGA = ('AGUARDANDO_VALIDACAO', 'CONFIRMADA')
+
+
+def popular_contadores(apps, schema_editor):
+    """Cria os contadores de vagas dos cursos existentes a partir das inscrições atuais."""
+    Curso = apps.get_model('api', 'Curso')
+    InscricaoAluno = apps.get_model('api', 'InscricaoAluno')
+    VagaCurso = apps.get_model('api', 'VagaCurso')
+
+    contadores = []
+    for curso in Curso.objects.all().iterator():
+        inscricoes = InscricaoAluno.objects.filter(curso=curso, status__in=OCUPAM_VAGA)
+        contadores.append(VagaCurso(
+            curso=curso, tipo_vaga='INTERNO', capacidade=curso.vagas_internas,
+            ocupadas=inscricoes.filter(tipo_vaga='INTERNO').count(),
+        ))
+        contadores.append(VagaCurso(
+            curso=curso, tipo_vaga='EXTERNO', capacidade=curso.vagas_externas,
+            ocupadas=inscricoes.exclude(tipo_vaga='INTERNO').count(),
+        ))
+    VagaCurso.objects.bulk_create(contadores, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_vagacurso'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_popular_vagacurso'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscricaoaluno',
+            index=models.Index(condition=models.Q(('status', 'LISTA_ESPERA')), fields=['curso', 'data_inscricao', 'id'], name='inscricao_lista_espera_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_emailpendente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacaoInscricao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AGUARDANDO_VALIDACAO', 'Aguardando Validação'), ('CONFIRMADA', 'Confirmada'), ('LISTA_ESPERA', 'Lista de Espera'), ('CANCELADA', 'Cancelada')], max_length=30)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('inscricao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificacoes', to='api.inscricaoaluno')),
+            ],
+            options={
+                'verbose_name': 'Notificação de Inscrição',
+                'verbose_name_plural': 'Notificações de Inscrição',
+            },
+        ),
+    ]
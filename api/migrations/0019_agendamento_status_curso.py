@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_notificacaoinscricao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='proxima_transicao_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Próxima Mudança de Status'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(condition=models.Q(('proxima_transicao_em__isnull', False)), fields=['proxima_transicao_em'], name='curso_proxima_transicao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['status', 'data_inicio_inscricoes'], name='curso_status_ini_insc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['status', 'data_inicio_curso'], name='curso_status_ini_curso_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['status', 'data_fim_curso'], name='curso_status_fim_curso_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_agendamento_status_curso'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Tipo do Arquivo'),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='tamanho',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Tamanho (bytes)'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:25
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_metadados_documento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteudoArquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('arquivo', models.FileField(max_length=255, upload_to=api.models.caminho_conteudo)),
+                ('tamanho', models.PositiveBigIntegerField(verbose_name='Tamanho (bytes)')),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de Arquivo',
+                'verbose_name_plural': 'Conteúdos de Arquivo',
+            },
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='conteudo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documentos', to='api.conteudoarquivo'),
+        ),
+    ]
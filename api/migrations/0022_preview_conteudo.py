@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:27
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_conteudo_arquivo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conteudoarquivo',
+            name='preview',
+            field=models.FileField(blank=True, max_length=255, upload_to=api.models.caminho_preview),
+        ),
+        migrations.AddField(
+            model_name='conteudoarquivo',
+            name='status_preview',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('PRONTO', 'Pronto'), ('SEM_PREVIEW', 'Sem Preview'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='conteudoarquivo',
+            index=models.Index(condition=models.Q(('status_preview', 'PENDENTE')), fields=['id'], name='conteudo_preview_pendente_idx'),
+        ),
+    ]
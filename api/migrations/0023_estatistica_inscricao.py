@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_preview_conteudo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaInscricao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AGUARDANDO_VALIDACAO', 'Aguardando Validação'), ('CONFIRMADA', 'Confirmada'), ('LISTA_ESPERA', 'Lista de Espera'), ('CANCELADA', 'Cancelada')], max_length=30)),
+                ('tipo_vaga', models.CharField(choices=[('INTERNO', 'Interno'), ('EXTERNO', 'Externo'), ('NI', 'ni')], max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estatisticas_inscricoes', to='api.curso')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Inscrições',
+                'verbose_name_plural': 'Estatísticas de Inscrições',
+                'unique_together': {('curso', 'status', 'tipo_vaga')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def popular_estatisticas(apps, schema_editor):
+    """Conta as inscrições atuais por curso, status e tipo de vaga."""
+    InscricaoAluno = apps.get_model('api', 'InscricaoAluno')
+    EstatisticaInscricao = apps.get_model('api', 'EstatisticaInscricao')
+
+    contagens = InscricaoAluno.objects.order_by().values('curso_id', 'status', 'tipo_vaga').annotate(total=Count('id'))
+    EstatisticaInscricao.objects.bulk_create(
+        [EstatisticaInscricao(**contagem) for contagem in contagens], batch_size=1000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_estatistica_inscricao'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular_estatisticas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+from django.db.models.constants import LOOKUP_SEP
+
+
+def campos_solicitados(request):
+    """
+    Lê o parâmetro '?fields=id,nome' de uma requisição de leitura.
+    Retorna None quando o parâmetro não foi enviado.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return {campo.strip() for campo in fields.split(',') if campo.strip()}
+
+
+class CamposDinamicosSerializerMixin:
+    """
+    Mixin para ModelSerializers: mantém apenas os campos pedidos em '?fields='.
+    Só age no serializer de nível mais alto (os aninhados não recebem 'context'
+    no __init__), e nunca em requisições de escrita.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        solicitados = campos_solicitados(self.context.get('request'))
+        if solicitados is None:
+            return
+        for nome in set(self.fields) - solicitados:
+            self.fields.pop(nome)
+
+
+class CamposEsparsosViewMixin:
+    """
+    Mixin para ViewSets: quando o cliente envia '?fields=', adia (defer) as
+    colunas do modelo que nenhum dos campos pedidos utiliza e descarta os
+    prefetches que não serão serializados.
+    Deve ser usado junto com um serializer que tenha CamposDinamicosSerializerMixin.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if campos_solicitados(self.request) is None:
+            return queryset
+
+        campos = self.get_serializer().fields.values()
+        fontes = set()
+        for campo in campos:
+            if campo.source == '*':
+                # SerializerMethodField e afins: não dá para saber o que usam.
+                return queryset
+            fonte = campo.source.split('.')[0].split(LOOKUP_SEP)[0]
+            if fonte.startswith('get_') and fonte.endswith('_display'):
+                fonte = fonte[len('get_'):-len('_display')]
+            fontes.add(fonte)
+
+        # Colunas usadas na ordenação (e no cursor da paginação) nunca são adiadas
+        ordenacao = list(queryset.query.order_by) + list(getattr(self.paginator, 'ordering', None) or ())
+        fontes.update(campo.lstrip('-').split(LOOKUP_SEP)[0] for campo in ordenacao if isinstance(campo, str))
+
+        opts = queryset.model._meta
+        adiados = [
+            f.name for f in opts.concrete_fields
+            if not f.is_relation and not f.primary_key and f.name not in fontes
+        ]
+        relacoes = {f.name for f in opts.get_fields() if f.is_relation}
+        if not fontes & relacoes:
+            queryset = queryset.select_related(None).prefetch_related(None)
+        return queryset.defer(*adiados) if adiados else queryset
@@ -2,7 +2,9 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.db import models, transaction
 from django.core.validators import RegexValidator, EmailValidator
-from .managers import CustomUserManager
+from django.utils import timezone
+from .managers import CustomUserManager, CursoQuerySet, ProfessorQuerySet
+import os
 import uuid
 
 cpf_validator = RegexValidator(
@@ -131,6 +133,8 @@ class Professor(models.Model):
     cpf = models.CharField(max_length=14, unique=True, validators=[cpf_validator])
     data_nascimento = models.DateField(null=True, blank=True)
 
+    objects = ProfessorQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Professor"
         verbose_name_plural = "Professores"
@@ -163,14 +167,31 @@ class Curso(models.Model):
     data_inicio_curso = models.DateField(verbose_name="Início do Curso")
     data_fim_curso = models.DateField(verbose_name="Fim do Curso")
     status = models.CharField(max_length=20, choices=StatusChoices.choices, default=StatusChoices.AGENDADO, verbose_name="Status do Curso")
+    # Quando o status muda sozinho da próxima vez (ver api/status_cursos.py). Nulo para cursos encerrados.
+    proxima_transicao_em = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Próxima Mudança de Status")
 
     # --- Relações ---
     criador = models.ForeignKey(Professor, on_delete=models.SET_NULL, null=True, related_name='cursos_criados', verbose_name="Professor Criador")
-    
+
+    objects = CursoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
         ordering = ['nome']
+        indexes = [
+            # Usado pela paginação por cursor da listagem de cursos
+            models.Index(fields=['nome', 'id'], name='curso_nome_id_idx'),
+            # Agendador de status: próximas transições e reconciliação por status/data
+            models.Index(
+                fields=['proxima_transicao_em'],
+                condition=models.Q(proxima_transicao_em__isnull=False),
+                name='curso_proxima_transicao_idx',
+            ),
+            models.Index(fields=['status', 'data_inicio_inscricoes'], name='curso_status_ini_insc_idx'),
+            models.Index(fields=['status', 'data_inicio_curso'], name='curso_status_ini_curso_idx'),
+            models.Index(fields=['status', 'data_fim_curso'], name='curso_status_fim_curso_idx'),
+        ]
 
     def __str__(self):
         return self.nome
@@ -203,11 +224,109 @@ class InscricaoAluno(models.Model):
     )
     class Meta:
         unique_together = ('aluno', 'curso')
+        indexes = [
+            # Usados pela paginação por cursor (ordem de chegada), com e sem filtro por curso
+            models.Index(fields=['data_inscricao', 'id'], name='inscricao_data_id_idx'),
+            models.Index(fields=['curso', 'data_inscricao', 'id'], name='inscricao_curso_data_id_idx'),
+            # Cabeça da lista de espera de um curso (ver api/vagas.py)
+            models.Index(
+                fields=['curso', 'data_inscricao', 'id'],
+                condition=models.Q(status='LISTA_ESPERA'),
+                name='inscricao_lista_espera_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Inscrição de {self.aluno.user.username} em {self.curso.nome}"
     
 
+class VagaCurso(models.Model):
+    """
+    Contador de vagas ocupadas de um curso por tipo de vaga (INTERNO/EXTERNO).
+    Uma inscrição ocupa vaga enquanto está AGUARDANDO_VALIDACAO ou CONFIRMADA.
+    A reserva é um UPDATE condicional nesta linha (ver api/vagas.py), feito na
+    mesma transação que grava a inscrição.
+    """
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='contadores_vagas')
+    tipo_vaga = models.CharField(max_length=10, choices=InscricaoAluno.TipoVaga.choices)
+    capacidade = models.PositiveIntegerField()
+    ocupadas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Contador de Vagas"
+        verbose_name_plural = "Contadores de Vagas"
+        unique_together = ('curso', 'tipo_vaga')
+
+    def __str__(self):
+        return f"{self.curso.nome} ({self.tipo_vaga}): {self.ocupadas}/{self.capacidade}"
+
+
+class EstatisticaInscricao(models.Model):
+    """
+    Quantidade de inscrições de um curso por status e tipo de vaga, mantida na
+    mesma transação que cria/altera/remove as inscrições (ver api/estatisticas.py).
+    O relatório do CCA sem filtro de período lê daqui (api/relatorios.py). O comando 'reconstruir_estatisticas' recalcula a tabela a partir das inscrições.
+    """
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='estatisticas_inscricoes')
+    status = models.CharField(max_length=30, choices=InscricaoAluno.StatusInscricao.choices)
+    tipo_vaga = models.CharField(max_length=10, choices=InscricaoAluno.TipoVaga.choices)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Estatística de Inscrições"
+        verbose_name_plural = "Estatísticas de Inscrições"
+        unique_together = ('curso', 'status', 'tipo_vaga')
+
+    def __str__(self):
+        return f"{self.curso_id} ({self.status}/{self.tipo_vaga}): {self.total}"
+
+
+def caminho_conteudo(instance, filename):
+    """documentos/ab/abcdef...(sha256).ext: o nome do arquivo é o hash do conteúdo."""
+    extensao = os.path.splitext(filename)[1].lower()
+    return f"documentos/{instance.sha256[:2]}/{instance.sha256}{extensao}"
+
+
+def caminho_preview(instance, filename):
+    """O preview fica ao lado do original: documentos/ab/abcdef....preview.jpg"""
+    return f"documentos/{instance.sha256[:2]}/{instance.sha256}.preview.jpg"
+
+
+class ConteudoArquivo(models.Model):
+    """
+    Conteúdo de arquivo armazenado uma única vez, identificado pelo SHA-256.
+    Vários Documentos (ex.: o mesmo RG enviado para cursos diferentes) apontam
+    para o mesmo conteúdo; 'referencias' conta quantos, e o arquivo só é apagado
+    quando a última referência sai (ver api/documentos.py).
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    arquivo = models.FileField(upload_to=caminho_conteudo, max_length=255)
+    tamanho = models.PositiveBigIntegerField(verbose_name="Tamanho (bytes)")
+    referencias = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class StatusPreview(models.TextChoices):
+        PENDENTE = 'PENDENTE', 'Pendente'
+        PRONTO = 'PRONTO', 'Pronto'
+        SEM_PREVIEW = 'SEM_PREVIEW', 'Sem Preview'
+        FALHOU = 'FALHOU', 'Falhou'
+
+    # Miniatura (1ª página do PDF ou imagem reduzida), gerada pelo comando 'gerar_previews'
+    preview = models.FileField(upload_to=caminho_preview, max_length=255, blank=True)
+    status_preview = models.CharField(max_length=12, choices=StatusPreview.choices, default=StatusPreview.PENDENTE)
+
+    class Meta:
+        verbose_name = "Conteúdo de Arquivo"
+        verbose_name_plural = "Conteúdos de Arquivo"
+        indexes = [
+            # Fila do gerador de previews
+            models.Index(fields=['id'], condition=models.Q(status_preview='PENDENTE'), name='conteudo_preview_pendente_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.referencias} referência(s))"
+
+
 class Documento(models.Model):
     # A ligação: Cada documento pertence a UMA inscrição.
     inscricao = models.ForeignKey(
@@ -220,11 +339,78 @@ class Documento(models.Model):
     # 'upload_to' diz ao Django para salvar os arquivos em uma pasta 'documentos_inscricao'
     # dentro da sua pasta de media.
     arquivo = models.FileField(upload_to='documentos_inscricao/')
+    # Conteúdo compartilhado; 'arquivo' aponta para o mesmo caminho. Nulo em documentos
+    # ainda não deduplicados (ver o comando 'deduplicar_documentos').
+    conteudo = models.ForeignKey(
+        ConteudoArquivo, on_delete=models.PROTECT, null=True, blank=True, related_name='documentos'
+    )
 
     # Opcional: o nome que o arquivo tinha no computador do usuário
     nome_original = models.CharField(max_length=255, blank=True)
 
+    # Preenchidos durante o upload (ver api/uploads.py); vazios em documentos antigos
+    tamanho = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Tamanho (bytes)")
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256")
+    content_type = models.CharField(max_length=100, blank=True, verbose_name="Tipo do Arquivo")
+
     data_upload = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Documento para a inscrição {self.inscricao.id} - {self.nome_original}"
\ No newline at end of file
+        return f"Documento para a inscrição {self.inscricao.id} - {self.nome_original}"
+
+
+class EmailPendente(models.Model):
+    """
+    Caixa de saída de e-mails. As views apenas gravam aqui; o envio é feito em
+    lotes pelo comando 'enviar_emails' (ver api/emails.py).
+    """
+    class StatusEnvio(models.TextChoices):
+        PENDENTE = 'PENDENTE', 'Pendente'
+        ENVIADO = 'ENVIADO', 'Enviado'
+        FALHOU = 'FALHOU', 'Falhou'
+
+    assunto = models.CharField(max_length=255)
+    mensagem = models.TextField()
+    mensagem_html = models.TextField(blank=True)
+    remetente = models.CharField(max_length=255, blank=True)
+    destinatarios = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=StatusEnvio.choices, default=StatusEnvio.PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    ultimo_erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "E-mail Pendente"
+        verbose_name_plural = "E-mails Pendentes"
+        indexes = [
+            # Próximos e-mails a enviar
+            models.Index(
+                fields=['proxima_tentativa'],
+                condition=models.Q(status='PENDENTE'),
+                name='email_pendente_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assunto} -> {', '.join(self.destinatarios)} ({self.status})"
+
+
+class NotificacaoInscricao(models.Model):
+    """
+    Mudança de status de uma inscrição que ainda precisa ser avisada ao aluno.
+    Gravada na mesma transação da mudança; o worker 'enviar_emails' agrupa os
+    eventos por aluno, gera os e-mails e apaga os eventos (ver api/notificacoes.py).
+    """
+    inscricao = models.ForeignKey(InscricaoAluno, on_delete=models.CASCADE, related_name='notificacoes')
+    status = models.CharField(max_length=30, choices=InscricaoAluno.StatusInscricao.choices)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Notificação de Inscrição"
+        verbose_name_plural = "Notificações de Inscrição"
+
+    def __str__(self):
+        return f"Inscrição {self.inscricao_id} -> {self.status}"
@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.template.loader import get_template
+
+from api.emails import montar_email
+from api.models import EmailPendente, NotificacaoInscricao
+
+ASSUNTO_UMA = 'Atualização da sua inscrição em {curso}'
+ASSUNTO_VARIAS = 'Atualizações das suas inscrições'
+
+
+def registrar_mudancas(mudancas):
+    """
+    Grava os eventos de mudança de status [(inscricao_id, novo_status), ...] com
+    um único INSERT. Deve rodar na mesma transação que mudou as inscrições, para
+    que o evento só exista se a mudança for confirmada.
+    """
+    eventos = [NotificacaoInscricao(inscricao_id=pk, status=novo) for pk, novo in mudancas]
+    if eventos:
+        NotificacaoInscricao.objects.bulk_create(eventos)
+
+
+def _agrupar_por_aluno(eventos):
+    """
+    Junta os eventos de cada aluno. Várias mudanças da mesma inscrição viram uma
+    só (vale o último status), e as inscrições de um aluno vão no mesmo e-mail.
+    Retorna {aluno_id: (user, [(curso_nome, status), ...])}.
+    """
+    ultimo_status = {}
+    for evento in eventos:  # em ordem de id: o último evento de cada inscrição prevalece
+        ultimo_status[evento.inscricao_id] = evento
+
+    por_aluno = defaultdict(list)
+    for evento in ultimo_status.values():
+        por_aluno[evento.inscricao.aluno_id].append(evento)
+
+    grupos = {}
+    for aluno_id, eventos_aluno in por_aluno.items():
+        user = eventos_aluno[0].inscricao.aluno.user
+        itens = sorted((e.inscricao.curso.nome, e.status) for e in eventos_aluno)
+        grupos[aluno_id] = (user, itens)
+    return grupos
+
+
+def processar_notificacoes(limite=500):
+    """
+    Transforma até 'limite' eventos pendentes em e-mails da caixa de saída:
+    - um e-mail por aluno com todas as suas inscrições alteradas;
+    - os templates são compilados uma vez e cada variante (mesmos cursos e
+      status) é renderizada uma vez só, ainda que vá para centenas de alunos;
+    - os e-mails entram com um bulk_create e os eventos são apagados na mesma
+      transação. O envio fica com enviar_pendentes (uma conexão por lote).
+    Retorna (eventos processados, e-mails gerados).
+    """
+    with transaction.atomic():
+        eventos = list(
+            NotificacaoInscricao.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('inscricao__aluno__user', 'inscricao__curso')
+            .order_by('id')[:limite]
+        )
+        if not eventos:
+            return 0, 0
+
+        template_txt = get_template('emails/status_inscricao.txt')
+        template_html = get_template('emails/status_inscricao.html')
+        renderizados = {}
+        emails = []
+        for user, itens in _agrupar_por_aluno(eventos).values():
+            if not user.email:
+                continue
+            variante = tuple(itens)
+            if variante not in renderizados:
+                contexto = {'itens': [{'curso': curso, 'status': status} for curso, status in itens]}
+                assunto = ASSUNTO_UMA.format(curso=itens[0][0]) if len(itens) == 1 else ASSUNTO_VARIAS
+                renderizados[variante] = (
+                    assunto, template_txt.render(contexto), template_html.render(contexto)
+                )
+            assunto, texto, html = renderizados[variante]
+            emails.append(montar_email(assunto, texto, [user.email], mensagem_html=html))
+
+        EmailPendente.objects.bulk_create(emails)
+        NotificacaoInscricao.objects.filter(pk__in=[e.pk for e in eventos]).delete()
+    return len(eventos), len(emails)
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PadraoCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) usada por padrão nas listagens.
+    Ao contrário da paginação por página/offset, o cursor continua estável
+    quando novos registros são inseridos durante a navegação.
+    URL: /alunos/?page_size=100&cursor=<token>
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-id',)
+
+
+class CursoCursorPagination(PadraoCursorPagination):
+    """Cursos em ordem alfabética, desempatando pelo id (índice nome, id)."""
+    ordering = ('nome', 'id')
+
+
+class InscricaoCursorPagination(PadraoCursorPagination):
+    """Inscrições em ordem de chegada (índice data_inscricao, id)."""
+    ordering = ('data_inscricao', 'id')
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models import Curso
+
+CAMPOS_CURSO = (
+    'id', 'nome', 'descricao_curta', 'carga_horaria',
+    'data_inicio_inscricoes', 'data_fim_inscricoes', 'data_inicio_curso', 'data_fim_curso',
+)
+
+
+def _chave(curso_id):
+    return f'painel:curso:{curso_id}'
+
+
+def dados_dos_cursos(ids):
+    """
+    Dados do card de cada curso com as vagas restantes, {id: dict}.
+    Cada curso fica em cache por PAINEL_CACHE_SEGUNDOS; os que faltam no cache
+    vêm de uma única consulta, com as vagas restantes calculadas dos contadores
+    de vagas como na listagem de cursos (CursoQuerySet.com_vagas_restantes).
+    """
+    chaves = {_chave(curso_id): curso_id for curso_id in ids}
+    encontrados = cache.get_many(list(chaves))
+    dados = {chaves[chave]: valor for chave, valor in encontrados.items()}
+
+    faltando = [curso_id for curso_id in ids if curso_id not in dados]
+    if faltando:
+        novos = {
+            curso['id']: curso
+            for curso in Curso.objects.filter(pk__in=faltando).order_by().com_vagas_restantes().values(
+                *CAMPOS_CURSO, 'vagas_internas_restantes', 'vagas_externas_restantes',
+            )
+        }
+        cache.set_many({_chave(curso_id): curso for curso_id, curso in novos.items()}, settings.PAINEL_CACHE_SEGUNDOS)
+        dados.update(novos)
+    return dados
@@ -1,6 +1,8 @@
 from rest_framework.permissions import BasePermission
 from rest_framework import permissions
 
+from api.roles import papeis_do_usuario
+
 class IsAdminUser(BasePermission):
     " Permite acesso apenas a usuários autenticados e que sejam administradores."
     def has_permission(self, request, view):
@@ -12,12 +14,12 @@ class IsCCAUser(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         # Verifica se o usuário está logado E se ele pertence ao grupo 'CCA'
-        return request.user.is_authenticated and request.user.groups.filter(name='CCA').exists()
+        return request.user.is_authenticated and papeis_do_usuario(request.user).is_cca
     
 class IsProfessorUser(permissions.BasePermission):
     """Permite acesso apenas a usuários que tenham um perfil de Professor."""
     def has_permission(self, request, view):
-        return request.user.is_authenticated and hasattr(request.user, 'professor')
+        return request.user.is_authenticated and papeis_do_usuario(request.user).professor_id is not None
 
 class IsProfessorOrCCAUser(permissions.BasePermission):
     """Permite acesso a usuários dos grupos 'PROFESSOR' ou 'CCA'."""
@@ -25,8 +27,9 @@ class IsProfessorOrCCAUser(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         # Aqui, como estamos checando múltiplos grupos, a verificação de grupos é ideal.
-        return request.user.groups.filter(name__in=['PROFESSOR', 'CCA']).exists()
+        papeis = papeis_do_usuario(request.user)
+        return papeis.is_professor or papeis.is_cca
     
 class IsAlunoUser(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.groups.filter(name='ALUNO').exists()
\ No newline at end of file
+        return request.user.is_authenticated and papeis_do_usuario(request.user).is_aluno
\ No newline at end of file
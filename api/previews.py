@@ -0,0 +1,71 @@
+"""
+Geração de previews dos documentos. Estas funções rodam nos processos do
+ProcessPoolExecutor do comando 'gerar_previews', por isso não dependem do
+Django: recebem o caminho do arquivo e devolvem os bytes do JPEG.
+
+- Imagens: reduzidas com Pillow (opcional; sem ele, imagens ficam sem preview).
+- PDF: primeira página renderizada pelo 'pdftoppm' (poppler-utils).
+"""
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional
+    Image = None
+
+LADO_MAXIMO = 800
+QUALIDADE_JPEG = 75
+TEMPO_MAXIMO_PDF = 60  # segundos
+
+
+class PreviewIndisponivel(Exception):
+    """Tipo de arquivo sem preview (ou ferramenta necessária não instalada)."""
+
+
+def _reduzir_imagem(origem):
+    if Image is None:
+        raise PreviewIndisponivel('Pillow não está instalado.')
+    with Image.open(origem) as imagem:
+        imagem.draft('RGB', (LADO_MAXIMO, LADO_MAXIMO))  # JPEG: decodifica já reduzido
+        imagem = imagem.convert('RGB')
+        imagem.thumbnail((LADO_MAXIMO, LADO_MAXIMO))
+        saida = io.BytesIO()
+        imagem.save(saida, 'JPEG', quality=QUALIDADE_JPEG, optimize=True)
+        return saida.getvalue()
+
+
+def _primeira_pagina_pdf(caminho):
+    if shutil.which('pdftoppm') is None:
+        raise PreviewIndisponivel('pdftoppm (poppler-utils) não está instalado.')
+    with tempfile.TemporaryDirectory() as pasta:
+        prefixo = os.path.join(pasta, 'pagina')
+        subprocess.run(
+            ['pdftoppm', '-f', '1', '-l', '1', '-singlefile', '-jpeg',
+             '-jpegopt', f'quality={QUALIDADE_JPEG}', '-scale-to', str(LADO_MAXIMO), caminho, prefixo],
+            check=True, capture_output=True, timeout=TEMPO_MAXIMO_PDF,
+        )
+        with open(prefixo + '.jpg', 'rb') as pagina:
+            return pagina.read()
+
+
+def gerar_preview(caminho):
+    """
+    Retorna (jpeg, None) com o preview, (None, None) se o arquivo não tem preview
+    possível, ou (None, erro) se a geração falhou.
+    """
+    try:
+        with open(caminho, 'rb') as arquivo:
+            inicio = arquivo.read(5)
+        if inicio == b'%PDF-':
+            return _primeira_pagina_pdf(caminho), None
+        return _reduzir_imagem(caminho), None
+    except PreviewIndisponivel:
+        return None, None
+    except Exception as e:
+        if Image is not None and isinstance(e, Image.UnidentifiedImageError):
+            return None, None  # não é PDF nem imagem
+        return None, f'{type(e).__name__}: {e}'
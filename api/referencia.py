@@ -0,0 +1,77 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+# Versão atual dos dados de referência (estados, municípios e opções de formulário).
+# Todas as chaves de cache e ETags derivam dela; trocar a versão invalida tudo de uma vez.
+# Fica no cache 'referencia', que não descarta entradas (ver CACHES em config/settings.py).
+CHAVE_VERSAO = 'referencia:versao'
+
+
+def _cache():
+    return caches['referencia']
+
+
+def versao_referencia():
+    cache = _cache()
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        # 'add' evita que dois processos gerem versões diferentes ao mesmo tempo
+        cache.add(CHAVE_VERSAO, uuid.uuid4().hex, None)
+        versao = cache.get(CHAVE_VERSAO)
+    return versao
+
+
+def invalidar_referencia():
+    """Gera uma nova versão. Chamado pelo import_data após carregar os dados do IBGE."""
+    _cache().set(CHAVE_VERSAO, uuid.uuid4().hex, None)
+
+
+def _etag(*partes):
+    return '"%s"' % hashlib.sha256('|'.join(partes).encode()).hexdigest()[:40]
+
+
+def dados_referencia(nome, construir):
+    """
+    Retorna (etag, dados) do conjunto 'nome', construindo-o com 'construir()'
+    apenas quando não estiver no cache da versão atual.
+    """
+    chave = f'referencia:{versao_referencia()}:{nome}'
+    item = _cache().get(chave)
+    if item is None:
+        dados = construir()
+        item = (_etag(json.dumps(dados, sort_keys=True, cls=DjangoJSONEncoder)), dados)
+        _cache().set(chave, item, None)
+    return item
+
+
+def etag_da_requisicao(request):
+    """ETag que depende só da versão e da URL (path + query string)."""
+    return _etag(versao_referencia(), request.get_full_path())
+
+
+def resposta_nao_modificada(request, etag):
+    """
+    Devolve um 304 se o cliente já tem a versão 'etag' (If-None-Match), ou None.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _cabecalhos_cache(response, etag)
+    return response
+
+
+def resposta_referencia(request, etag, dados):
+    response = Response(dados)
+    _cabecalhos_cache(response, etag)
+    return response
+
+
+def _cabecalhos_cache(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=settings.REFERENCIA_CACHE_MAX_AGE)
@@ -0,0 +1,155 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.models import Aluno, EstatisticaInscricao, InscricaoAluno
+
+Status = InscricaoAluno.StatusInscricao
+
+# Contagens por status calculadas em cada agrupamento
+_POR_STATUS = {
+    'aguardando_validacao': Status.AGUARDANDO_VALIDACAO,
+    'confirmadas': Status.CONFIRMADA,
+    'lista_espera': Status.LISTA_ESPERA,
+    'canceladas': Status.CANCELADA,
+}
+
+_CAMPOS_CURSO = (
+    'curso_id', 'curso__nome', 'curso__vagas_internas', 'curso__vagas_externas', 'curso__criador_id',
+    'curso__criador__user__first_name', 'curso__criador__user__last_name', 'tipo_vaga',
+)
+
+
+def _taxa(parte, total):
+    return round(parte / total, 4) if total else None
+
+
+def _inscricoes(de=None, ate=None):
+    """Inscrições feitas entre as datas 'de' e 'ate' (inclusive, no fuso local)."""
+    inscricoes = InscricaoAluno.objects.order_by()
+    if de:
+        inscricoes = inscricoes.filter(data_inscricao__gte=timezone.make_aware(datetime.combine(de, time.min)))
+    if ate:
+        inscricoes = inscricoes.filter(
+            data_inscricao__lt=timezone.make_aware(datetime.combine(ate + timedelta(days=1), time.min))
+        )
+    return inscricoes
+
+
+def _somar(destino, linha, campos):
+    for campo in campos:
+        destino[campo] = destino.get(campo, 0) + linha[campo]
+
+
+def _ordenar(linhas):
+    return sorted(linhas, key=lambda linha: -linha['inscricoes'])
+
+
+def _contagens_por_curso(de=None, ate=None):
+    """
+    Uma linha por (curso, tipo de vaga) com o total de inscrições e as contagens
+    por status. Sem filtro de período, vem da tabela EstatisticaInscricao (mantida
+    a cada inscrição, ver api/estatisticas.py), sem percorrer as inscrições.
+    """
+    if de or ate:
+        return _inscricoes(de, ate).values(*_CAMPOS_CURSO).annotate(
+            inscricoes=Count('id'),
+            **{campo: Count('id', filter=Q(status=status)) for campo, status in _POR_STATUS.items()},
+        )
+    return EstatisticaInscricao.objects.filter(total__gt=0).order_by().values(*_CAMPOS_CURSO).annotate(
+        inscricoes=Sum('total'),
+        **{campo: Coalesce(Sum('total', filter=Q(status=status)), 0) for campo, status in _POR_STATUS.items()},
+    )
+
+
+def por_curso(linhas):
+    """
+    Demanda por curso (com as contagens de cada tipo de vaga) e taxa de aprovação
+    por professor, somando as linhas de _contagens_por_curso (as contagens de cada
+    professor são a soma das dos seus cursos).
+    Taxa de aprovação = confirmadas / (confirmadas + canceladas).
+    """
+    contagens = ['inscricoes', *_POR_STATUS]
+    cursos, professores = {}, {}
+    for linha in linhas:
+        curso = cursos.get(linha['curso_id'])
+        if curso is None:
+            curso = cursos[linha['curso_id']] = {
+                'curso_id': linha['curso_id'],
+                'curso': linha['curso__nome'],
+                'vagas': linha['curso__vagas_internas'] + linha['curso__vagas_externas'],
+                'por_tipo_vaga': {},
+            }
+            nome = f"{linha['curso__criador__user__first_name'] or ''} {linha['curso__criador__user__last_name'] or ''}"
+            professor = professores.setdefault(linha['curso__criador_id'], {
+                'professor_id': linha['curso__criador_id'], 'professor': nome.strip() or None, 'cursos': 0,
+            })
+            professor['cursos'] += 1
+        _somar(curso, linha, contagens)
+        curso['por_tipo_vaga'][linha['tipo_vaga']] = {campo: linha[campo] for campo in contagens}
+        _somar(professores[linha['curso__criador_id']], linha, contagens)
+
+    for curso in cursos.values():
+        curso['inscritos_por_vaga'] = _taxa(curso['inscricoes'], curso['vagas'])
+    for professor in professores.values():
+        professor['taxa_aprovacao'] = _taxa(professor['confirmadas'], professor['confirmadas'] + professor['canceladas'])
+    return _ordenar(cursos.values()), _ordenar(professores.values())
+
+
+def por_perfil_do_aluno(inscricoes):
+    """
+    Inscritos por estado, município e sexo, a partir de um único GROUP BY
+    (município, sexo). Cada aluno tem um município e um sexo, então os alunos
+    distintos de cada grupo também podem ser somados.
+    """
+    contagens = ['alunos', 'inscricoes']
+    nomes_sexo = dict(Aluno.SexoChoices.choices)
+    linhas = inscricoes.values(
+        'aluno__cidade_id', 'aluno__cidade__nome', 'aluno__cidade__estado__uf', 'aluno__cidade__estado__nome',
+        'aluno__sexo',
+    ).annotate(alunos=Count('aluno_id', distinct=True), inscricoes=Count('id'))
+
+    estados, municipios, sexos = {}, {}, {}
+    for linha in linhas:
+        uf = linha['aluno__cidade__estado__uf']
+        _somar(estados.setdefault(uf, {'uf': uf, 'estado': linha['aluno__cidade__estado__nome']}), linha, contagens)
+        _somar(municipios.setdefault(linha['aluno__cidade_id'], {
+            'municipio_id': linha['aluno__cidade_id'], 'municipio': linha['aluno__cidade__nome'], 'uf': uf,
+        }), linha, contagens)
+        sexo = linha['aluno__sexo']
+        _somar(sexos.setdefault(sexo, {'sexo': sexo, 'sexo_display': nomes_sexo.get(sexo, sexo)}), linha, contagens)
+    return _ordenar(estados.values()), _ordenar(municipios.values()), _ordenar(sexos.values())
+
+
+def relatorio_inscricoes(de=None, ate=None):
+    """
+    Relatório do CCA sobre as inscrições do período: duas consultas com GROUP BY
+    no banco (por curso/tipo de vaga e por município/sexo do aluno); as demais
+    seções somam as linhas já agregadas. O resultado fica em cache por
+    RELATORIOS_CACHE_SEGUNDOS, com uma chave por combinação de filtros.
+    """
+    chave = f'relatorios:inscricoes:{de or ""}:{ate or ""}'
+    relatorio = cache.get(chave)
+    if relatorio is not None:
+        return relatorio
+
+    cursos, professores = por_curso(_contagens_por_curso(de, ate))
+    estados, municipios, sexos = por_perfil_do_aluno(_inscricoes(de, ate))
+    totais = {campo: sum(curso[campo] for curso in cursos) for campo in ('inscricoes', *_POR_STATUS)}
+    totais.update(alunos=sum(sexo['alunos'] for sexo in sexos), cursos=len(cursos))
+    relatorio = {
+        'filtros': {'de': de.isoformat() if de else None, 'ate': ate.isoformat() if ate else None},
+        'gerado_em': timezone.now().isoformat(),
+        'totais': totais,
+        'por_curso': cursos,
+        'por_estado': estados,
+        'por_municipio': municipios,
+        'por_sexo': sexos,
+        'aprovacao_por_professor': professores,
+    }
+    cache.set(chave, relatorio, settings.RELATORIOS_CACHE_SEGUNDOS)
+    return relatorio
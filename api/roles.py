@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Nome da claim do JWT que carrega os papéis do usuário
+CLAIM_PAPEIS = 'papeis'
+
+
+class PapeisUsuario:
+    """
+    Grupos e perfis (aluno/professor) de um usuário.
+    É resolvido uma única vez por requisição e reaproveitado pelas permissões
+    e pelos get_queryset das views.
+    """
+    __slots__ = ('grupos', 'aluno_id', 'professor_id')
+
+    def __init__(self, grupos=(), aluno_id=None, professor_id=None):
+        self.grupos = frozenset(grupos)
+        self.aluno_id = aluno_id
+        self.professor_id = professor_id
+
+    @property
+    def is_cca(self):
+        return 'CCA' in self.grupos
+
+    @property
+    def is_aluno(self):
+        return 'ALUNO' in self.grupos
+
+    @property
+    def is_professor(self):
+        return 'PROFESSOR' in self.grupos
+
+    def como_claims(self):
+        return {
+            'grupos': sorted(self.grupos),
+            'aluno_id': self.aluno_id,
+            'professor_id': self.professor_id,
+        }
+
+    @classmethod
+    def de_claims(cls, claims):
+        return cls(claims.get('grupos', ()), claims.get('aluno_id'), claims.get('professor_id'))
+
+
+def resolver_papeis(user_id):
+    """
+    Carrega grupos e perfis do usuário em UMA consulta.
+    """
+    linhas = get_user_model().objects.filter(pk=user_id).values_list(
+        'groups__name', 'perfil_aluno__id', 'professor__id'
+    )
+    grupos = set()
+    aluno_id = professor_id = None
+    for grupo, aluno, professor in linhas:
+        if grupo:
+            grupos.add(grupo)
+        aluno_id, professor_id = aluno, professor
+    return PapeisUsuario(grupos, aluno_id, professor_id)
+
+
+def papeis_do_usuario(user):
+    """
+    Retorna os papéis do usuário, guardando o resultado na própria instância.
+    Como 'request.user' é o mesmo objeto durante toda a requisição, as
+    verificações seguintes não voltam ao banco.
+    """
+    if user is None or not user.is_authenticated:
+        return PapeisUsuario()
+    papeis = getattr(user, '_papeis', None)
+    if papeis is None:
+        papeis = resolver_papeis(user.pk)
+        user._papeis = papeis
+    return papeis
+
+
+class PapeisRefreshToken(RefreshToken):
+    """
+    Refresh token que, com JWT_PAPEIS_NO_TOKEN ativo, embute os papéis do usuário
+    como claim. A claim é recalculada a cada refresh, então uma mudança de grupo
+    vale no máximo depois de ACCESS_TOKEN_LIFETIME.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        if settings.JWT_PAPEIS_NO_TOKEN:
+            token[CLAIM_PAPEIS] = papeis_do_usuario(user).como_claims()
+        return token
+
+    @property
+    def access_token(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if settings.JWT_PAPEIS_NO_TOKEN and user_id is not None:
+            self[CLAIM_PAPEIS] = resolver_papeis(user_id).como_claims()
+        elif CLAIM_PAPEIS in self.payload:
+            del self[CLAIM_PAPEIS]
+        return super().access_token
+
+
+class PapeisJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT que aproveita a claim de papéis, quando presente,
+    para que a requisição não precise consultar grupos/perfis no banco.
+    Aluno ou professor cujo token foi emitido antes de criar o perfil (id nulo
+    na claim) é resolvido no banco, até o próximo refresh trazer o perfil.
+    """
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        claims = validated_token.get(CLAIM_PAPEIS)
+        if settings.JWT_PAPEIS_NO_TOKEN and claims is not None:
+            papeis = PapeisUsuario.de_claims(claims)
+            if (papeis.is_aluno and papeis.aluno_id is None
+                    or papeis.is_professor and papeis.professor_id is None):
+                papeis = resolver_papeis(user.pk)
+            user._papeis = papeis
+        return user
@@ -1,11 +1,17 @@
 from rest_framework import serializers
-from django.db import transaction
+from rest_framework.reverse import reverse
+from django.db import IntegrityError
 from django.contrib.auth.models import Group
 from django.contrib.auth import get_user_model
 from api.models import(Aluno, Estado, Municipio,
 Professor, CustomUserManager, Curso, InscricaoAluno, 
-Documento)
+Documento, ConteudoArquivo)
 from django.contrib.auth.hashers import make_password
+from api.mixins import CamposDinamicosSerializerMixin
+from api.roles import PapeisRefreshToken, papeis_do_usuario
+from api.vagas import reservar_vaga
+from api.documentos import armazenar_conteudos, transacao_com_arquivos
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth.password_validation import validate_password
 User = get_user_model()
 
@@ -20,6 +26,16 @@ class MunicipioSerializer(serializers.ModelSerializer):
         model = Municipio
         fields = ['id', 'nome', 'estado']
         
+class PapeisTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login JWT que pode embutir os papéis do usuário no token (JWT_PAPEIS_NO_TOKEN)."""
+    token_class = PapeisRefreshToken
+
+
+class PapeisTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh JWT que recalcula a claim de papéis do usuário."""
+    token_class = PapeisRefreshToken
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """Recebe o e-mail para iniciar processo de reset de senha."""
 
@@ -185,7 +201,7 @@ class AlunoPerfilSerializer(serializers.ModelSerializer):
         # 3. Deixa o DRF fazer o resto do trabalho de atualizar os campos do Aluno
         return super().update(instance, validated_data)
 
-class AlunoReadOnlySerializer(serializers.ModelSerializer):
+class AlunoReadOnlySerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     """
     Serializer de LEITURA para o perfil do Aluno.
     Mostra todos os detalhes, incluindo o objeto 'user' completo.
@@ -209,7 +225,7 @@ class CursoBasicSerializer(serializers.ModelSerializer):
         fields = ['id', 'nome', 'status']
         
 
-class ProfessorSerializer(serializers.ModelSerializer):
+class ProfessorSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer() # Aninha o UserSerializer para leitura e escrita
     total_courses = serializers.SerializerMethodField()
     cursos_criados = CursoBasicSerializer(many=True, read_only=True)
@@ -224,7 +240,11 @@ class ProfessorSerializer(serializers.ModelSerializer):
         Esta função é chamada automaticamente para preencher o campo 'total_courses'.
         'obj' aqui é a instância do Professor.
         """
-        # Ele conta quantos cursos têm este professor como 'criador'
+        # Usa a anotação de ProfessorQuerySet.com_detalhes quando disponível;
+        # caso contrário, conta quantos cursos têm este professor como 'criador'
+        total = getattr(obj, 'total_cursos', None)
+        if total is not None:
+            return total
         return obj.cursos_criados.count()
     
 
@@ -261,14 +281,18 @@ class ProfessorSerializer(serializers.ModelSerializer):
         return instance
 
 
-class CursoSerializer(serializers.ModelSerializer):
+class CursoSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     criador = ProfessorSerializer(read_only=True)
+    # Anotados por CursoQuerySet.com_vagas_restantes(); None quando o curso não veio anotado
+    vagas_internas_restantes = serializers.IntegerField(read_only=True, allow_null=True)
+    vagas_externas_restantes = serializers.IntegerField(read_only=True, allow_null=True)
 
     class Meta:
         model = Curso
         fields = [
             'id', 'nome', 'descricao', 'descricao_curta', 'requisitos',
             'carga_horaria', 'vagas_internas', 'vagas_externas',
+            'vagas_internas_restantes', 'vagas_externas_restantes',
             'data_inicio_inscricoes', 'data_fim_inscricoes',
             'data_inicio_curso', 'data_fim_curso',
             'status', 
@@ -276,6 +300,13 @@ class CursoSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'criador', 'status']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Listagens anotadas com com_status_efetivo() mostram o status pelas datas
+        if 'status' in data and hasattr(instance, 'status_efetivo'):
+            data['status'] = instance.status_efetivo
+        return data
+
 class UserBasicSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -289,11 +320,40 @@ class AlunoBasicSerializer(serializers.ModelSerializer):
 
 
 class DocumentoSerializer(serializers.ModelSerializer):
+    # Endpoint autenticado de download (a pasta de mídia não é servida publicamente).
+    # 'arquivo' continua no payload para os clientes antigos, com a mesma URL.
+    arquivo = serializers.SerializerMethodField()
+    url_download = serializers.SerializerMethodField()
+    # Miniatura leve para a tela de validação; None enquanto não foi gerada
+    url_preview = serializers.SerializerMethodField()
+
     class Meta:
         model = Documento
-        fields = ['id', 'arquivo', 'nome_original', 'data_upload']
+        fields = [
+            'id', 'arquivo', 'nome_original', 'tamanho', 'sha256', 'content_type', 'data_upload',
+            'url_download', 'url_preview',
+        ]
+
+    def get_url_download(self, obj):
+        return reverse(
+            'inscricao-aluno-baixar-documento',
+            kwargs={'pk': obj.inscricao_id, 'documento_id': obj.pk},
+            request=self.context.get('request'),
+        )
+
+    def get_arquivo(self, obj):
+        return self.get_url_download(obj)
+
+    def get_url_preview(self, obj):
+        if obj.conteudo_id is None or obj.conteudo.status_preview != ConteudoArquivo.StatusPreview.PRONTO:
+            return None
+        return reverse(
+            'inscricao-aluno-preview-documento',
+            kwargs={'pk': obj.inscricao_id, 'documento_id': obj.pk},
+            request=self.context.get('request'),
+        )
 
-class InscricaoAlunoSerializer(serializers.ModelSerializer):
+class InscricaoAlunoSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     aluno = AlunoBasicSerializer(read_only=True)
     curso = CursoBasicSerializer(read_only=True)
     documentos = DocumentoSerializer(many=True, read_only=True)
@@ -324,7 +384,9 @@ class InscricaoAlunoSerializer(serializers.ModelSerializer):
         Este método é o "fiscal". Ele roda antes de qualquer tentativa de salvar.
         É o lugar perfeito para as suas validações de negócio.
         """
-        aluno = self.context['request'].user.perfil_aluno
+        aluno_id = papeis_do_usuario(self.context['request'].user).aluno_id
+        if aluno_id is None:
+            raise serializers.ValidationError('Complete seu perfil de aluno antes de se inscrever.')
         curso = data.get('curso')
         tipo_vaga = data.get('tipo_vaga')
         matricula = data.get('matricula')
@@ -334,33 +396,63 @@ class InscricaoAlunoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'matricula': 'Este campo é obrigatório para vagas internas.'})
         
         # 1. Validação de duplicação
-        if InscricaoAluno.objects.filter(aluno=aluno, curso=curso).exists():
+        if InscricaoAluno.objects.filter(aluno_id=aluno_id, curso=curso).exists():
             raise serializers.ValidationError('Você já solicitou inscrição neste curso.')
 
-        # 2. Validação de vagas (com transação para segurança)
-        with transaction.atomic():
-            curso_locked = Curso.objects.select_for_update().get(id=curso.id)
-            vagas_totais = curso_locked.vagas_internas if tipo_vaga == 'INTERNO' else curso_locked.vagas_externas
-            inscricoes_confirmadas = InscricaoAluno.objects.filter(
-                curso=curso_locked, tipo_vaga=tipo_vaga, status='CONFIRMADA'
-            ).count()
-            if inscricoes_confirmadas >= vagas_totais:
-                raise serializers.ValidationError('Não há mais vagas disponíveis para este tipo.')
-        
+        # 2. A disponibilidade de vagas é garantida no create(), na mesma transação do INSERT.
         return data
 
     def create(self, validated_data):
         """
-        Cria a Inscrição e depois os Documentos associados.
+        Guarda os arquivos, cria a Inscrição e os Documentos e reserva a vaga,
+        tudo numa única transação.
         """
         arquivos = validated_data.pop('arquivos_upload', [])
-        
-        # Cria a Inscrição com os dados já validados.
+
+        # Os arquivos já chegaram em disco com o hash calculado (DocumentoUploadHandler).
+        # Conteúdo repetido (o mesmo RG em vários cursos) reaproveita o arquivo já
+        # guardado; os novos são só renomeados para o storage e apagados de novo se
+        # a transação não for confirmada. Um único INSERT para todos os Documentos.
+        # Sem vagas, a inscrição entra na lista de espera do curso/tipo de vaga.
         # 'aluno' será injetado pelo perform_create da ViewSet.
-        inscricao = super().create(validated_data)
-        
-        # Cria os objetos Documento para cada arquivo enviado
-        for arquivo in arquivos:
-            Documento.objects.create(inscricao=inscricao, arquivo=arquivo, nome_original=arquivo.name)
-            
-        return inscricao
\ No newline at end of file
+        try:
+            with transacao_com_arquivos() as novos:
+                conteudos = armazenar_conteudos(arquivos, novos)
+                inscricao = super().create(validated_data)
+                Documento.objects.bulk_create([
+                    Documento(
+                        inscricao=inscricao,
+                        conteudo=conteudo,
+                        arquivo=conteudo.arquivo.name,
+                        nome_original=arquivo.name,
+                        tamanho=conteudo.tamanho,
+                        sha256=conteudo.sha256,
+                        content_type=(arquivo.content_type or '')[:100],
+                    )
+                    for arquivo, conteudo in zip(arquivos, conteudos)
+                ])
+                # Último passo antes do commit: o contador fica bloqueado o mínimo possível
+                if not reservar_vaga(inscricao.curso_id, inscricao.tipo_vaga):
+                    inscricao.status = InscricaoAluno.StatusInscricao.LISTA_ESPERA
+                    inscricao.save(update_fields=['status'])
+        except IntegrityError:
+            # Duas requisições simultâneas do mesmo aluno: a unique (aluno, curso) barra a segunda
+            raise serializers.ValidationError('Você já solicitou inscrição neste curso.')
+
+        return inscricao
+
+
+class DecisaoValidacaoSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    aprovar = serializers.BooleanField()
+
+
+class ValidacaoLoteSerializer(serializers.Serializer):
+    """Decisões do CCA para validar várias inscrições de uma vez."""
+    decisoes = DecisaoValidacaoSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_decisoes(self, value):
+        ids = [decisao['id'] for decisao in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Cada inscrição só pode aparecer uma vez.')
+        return value
@@ -0,0 +1,113 @@
+from collections import Counter
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from api.documentos import liberar_conteudos
+from api.estatisticas import ajustar_estatisticas
+from api.models import Curso, Documento, Estado, InscricaoAluno, Municipio
+from api.notificacoes import registrar_mudancas
+from api.referencia import invalidar_referencia
+from api.status_cursos import atualizar_status
+from api.vagas import STATUS_OCUPAM_VAGA, liberar_vagas, sincronizar_capacidade
+
+
+@receiver([post_save, post_delete], sender=Estado)
+@receiver([post_save, post_delete], sender=Municipio)
+def dados_referencia_alterados(sender, **kwargs):
+    """
+    Alterações feitas fora do import_data (ex.: pelo admin) também invalidam
+    o cache dos dados de referência e o índice de municípios.
+    """
+    invalidar_referencia()
+
+
+@receiver(pre_save, sender=Curso)
+def agendar_status_curso(sender, instance, update_fields=None, **kwargs):
+    """
+    Ao salvar o curso, já aplica as transições vencidas (ex.: inscrições que
+    abriram no passado) e agenda a próxima. Saves parciais que não gravam
+    status e proxima_transicao_em ficam para o reconciliar() do agendador.
+    """
+    if update_fields is None or {'status', 'proxima_transicao_em'} <= set(update_fields):
+        atualizar_status(instance)
+
+
+@receiver(post_save, sender=Curso)
+def curso_salvo(sender, instance, **kwargs):
+    """Cria/atualiza os contadores de vagas com as vagas internas e externas do curso."""
+    sincronizar_capacidade(instance)
+
+
+@receiver(post_init, sender=InscricaoAluno)
+def inscricao_carregada(sender, instance, **kwargs):
+    """Guarda o status carregado para detectar a mudança no save (sem consultar se estiver adiado)."""
+    instance._status_salvo = instance.__dict__.get('status')
+    # Inscrição ainda não gravada não está nas estatísticas: entra no primeiro save
+    instance._estatistica_salva = _chave_estatistica(instance) if instance.pk is not None else None
+
+
+def _chave_estatistica(inscricao):
+    """(curso_id, status, tipo_vaga) da inscrição; None se algum campo não foi carregado."""
+    chave = tuple(inscricao.__dict__.get(campo) for campo in ('curso_id', 'status', 'tipo_vaga'))
+    return None if None in chave else chave
+
+
+@receiver(post_save, sender=InscricaoAluno)
+def inscricao_salva(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Registra a mudança de status feita por um save() (ex.: inscrição que foi para
+    a lista de espera, edição pelo admin) e atualiza as estatísticas do curso.
+    As mudanças em lote de api/vagas.py usam UPDATE e registram ambos diretamente.
+    """
+    anterior, atual = instance._status_salvo, instance.__dict__.get('status')
+    instance._status_salvo = atual
+    if atual is None:
+        return
+    if created:
+        mudou = atual != InscricaoAluno.StatusInscricao.AGUARDANDO_VALIDACAO
+    elif anterior is None:
+        # O status não tinha sido carregado: só conta se o save o gravou explicitamente
+        mudou = update_fields is not None and 'status' in update_fields
+    else:
+        mudou = atual != anterior
+    if mudou:
+        registrar_mudancas([(instance.pk, atual)])
+
+    # Estatísticas por curso/status/tipo de vaga (api/estatisticas.py)
+    chave_anterior, chave_atual = instance._estatistica_salva, _chave_estatistica(instance)
+    instance._estatistica_salva = chave_atual
+    if chave_atual is None:
+        return
+    if created:
+        ajustar_estatisticas({chave_atual: 1})
+    elif chave_anterior is not None and chave_anterior != chave_atual:
+        ajustar_estatisticas(Counter({chave_atual: 1, chave_anterior: -1}))
+    # chave_anterior None: campos adiados, fica para o 'reconstruir_estatisticas'
+
+
+@receiver(post_delete, sender=InscricaoAluno)
+def inscricao_removida(sender, instance, origin=None, **kwargs):
+    """
+    Inscrição removida por qualquer caminho (API, admin, ou em cascata ao apagar
+    o usuário/aluno): a vaga que ela ocupava vai para a cabeça da lista de espera
+    ou volta ao contador, e as estatísticas do curso são descontadas.
+    Se o próprio curso está sendo apagado, não há vaga a devolver.
+    """
+    # Campos atuais da instância (como para a vaga): a chave guardada no post_init
+    # fica velha depois de um refresh_from_db()
+    chave = _chave_estatistica(instance)
+    if chave is not None:
+        ajustar_estatisticas({chave: -1})
+
+    curso_apagado = isinstance(origin, Curso) or (isinstance(origin, QuerySet) and origin.model is Curso)
+    if not curso_apagado and instance.__dict__.get('status') in STATUS_OCUPAM_VAGA:
+        liberar_vagas(instance.curso_id, instance.tipo_vaga)
+
+
+@receiver(post_delete, sender=Documento)
+def documento_removido(sender, instance, **kwargs):
+    """Devolve a referência ao conteúdo (ex.: inscrição apagada em cascata)."""
+    if instance.conteudo_id is not None:
+        liberar_conteudos([instance.conteudo_id])
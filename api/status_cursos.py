@@ -0,0 +1,109 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import Curso
+
+StatusCurso = Curso.StatusChoices
+
+# Status que ainda têm uma próxima transição automática
+STATUS_ATIVOS = (StatusCurso.AGENDADO, StatusCurso.INSCRICOES_ABERTAS, StatusCurso.EM_ANDAMENTO)
+
+
+def _inicio_do_dia(data):
+    """Meia-noite (no fuso do projeto) do dia 'data'."""
+    return timezone.make_aware(datetime.combine(data, time.min))
+
+
+def proxima_transicao(curso):
+    """
+    (próximo status, quando) a partir do status atual do curso, ou None se o
+    curso não muda mais sozinho (FINALIZADO/CANCELADO):
+    - AGENDADO -> INSCRIÇÕES ABERTAS em data_inicio_inscricoes;
+    - INSCRIÇÕES ABERTAS -> EM ANDAMENTO no dia data_inicio_curso;
+    - EM ANDAMENTO -> FINALIZADO no dia seguinte a data_fim_curso.
+    """
+    if curso.status == StatusCurso.AGENDADO:
+        return StatusCurso.INSCRICOES_ABERTAS, curso.data_inicio_inscricoes
+    if curso.status == StatusCurso.INSCRICOES_ABERTAS:
+        return StatusCurso.EM_ANDAMENTO, _inicio_do_dia(curso.data_inicio_curso)
+    if curso.status == StatusCurso.EM_ANDAMENTO:
+        return StatusCurso.FINALIZADO, _inicio_do_dia(curso.data_fim_curso + timedelta(days=1))
+    return None
+
+
+def atualizar_status(curso, agora=None):
+    """
+    Aplica no objeto (sem salvar) todas as transições já vencidas e agenda a
+    próxima em proxima_transicao_em. Um curso pode pular etapas (ex.: criado
+    com datas no passado ou o agendador ficou parado). Retorna True se o status mudou.
+    """
+    agora = agora or timezone.now()
+    status_inicial = curso.status
+    transicao = proxima_transicao(curso)
+    while transicao is not None and transicao[1] <= agora:
+        curso.status = transicao[0]
+        transicao = proxima_transicao(curso)
+    curso.proxima_transicao_em = transicao[1] if transicao else None
+    return curso.status != status_inicial
+
+
+def aplicar_transicoes(agora=None):
+    """
+    Atualiza só os cursos com transição vencida (proxima_transicao_em <= agora,
+    pelo índice). SKIP LOCKED deixa rodar mais de um agendador.
+    Retorna {novo_status: quantidade}.
+    """
+    agora = agora or timezone.now()
+    with transaction.atomic():
+        vencidos = list(
+            Curso.objects.select_for_update(skip_locked=True)
+            .filter(proxima_transicao_em__lte=agora)
+            .only('id', 'status', 'proxima_transicao_em', 'data_inicio_inscricoes', 'data_inicio_curso', 'data_fim_curso')
+        )
+        return _salvar(vencidos, agora)
+
+
+def reconciliar(agora=None):
+    """
+    Corrige cursos cujo agendamento não é confiável: sem proxima_transicao_em
+    (cursos anteriores à coluna ou alterados por UPDATE direto) ou com a data
+    do status atual já vencida. Cada filtro (status, data) usa um índice composto,
+    então só as linhas afetadas são lidas. Retorna {novo_status: quantidade}.
+    """
+    agora = agora or timezone.now()
+    hoje = timezone.localdate(agora)
+    candidatos = (
+        Q(status__in=STATUS_ATIVOS, proxima_transicao_em__isnull=True)
+        | Q(status=StatusCurso.AGENDADO, data_inicio_inscricoes__lte=agora)
+        | Q(status=StatusCurso.INSCRICOES_ABERTAS, data_inicio_curso__lte=hoje)
+        | Q(status=StatusCurso.EM_ANDAMENTO, data_fim_curso__lt=hoje)
+    )
+    with transaction.atomic():
+        cursos = list(
+            Curso.objects.select_for_update(skip_locked=True).filter(candidatos)
+            .only('id', 'status', 'proxima_transicao_em', 'data_inicio_inscricoes', 'data_inicio_curso', 'data_fim_curso')
+        )
+        return _salvar(cursos, agora)
+
+
+def _salvar(cursos, agora):
+    mudancas = {}
+    for curso in cursos:
+        if atualizar_status(curso, agora):
+            mudancas[curso.status] = mudancas.get(curso.status, 0) + 1
+    if cursos:
+        Curso.objects.bulk_update(cursos, ['status', 'proxima_transicao_em'])
+    return mudancas
+
+
+def proxima_transicao_agendada():
+    """Quando vence a próxima transição de qualquer curso (MIN pelo índice), ou None."""
+    return (
+        Curso.objects.filter(proxima_transicao_em__isnull=False)
+        .order_by('proxima_transicao_em')
+        .values_list('proxima_transicao_em', flat=True)
+        .first()
+    )
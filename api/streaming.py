@@ -0,0 +1,77 @@
+import json
+from itertools import islice
+
+TAMANHO_BLOCO = 64 * 1024
+_ESPACOS = ' \t\n\r'
+_FIM_ITEM = _ESPACOS + ',]'
+
+
+def em_lotes(registros, tamanho):
+    """Agrupa um iterável em listas de até 'tamanho' itens."""
+    registros = iter(registros)
+    while lote := list(islice(registros, tamanho)):
+        yield lote
+
+
+def iterar_array_json(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê um arquivo cujo conteúdo é um array JSON ('[{...}, {...}]') e devolve
+    um item por vez, sem decodificar o arquivo inteiro.
+    A memória usada fica limitada a um bloco de leitura mais o item atual,
+    então arquivos muito maiores que cidades.json podem ser importados.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    fim_arquivo = False
+
+    def ler_mais():
+        nonlocal buffer, pos, fim_arquivo
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            fim_arquivo = True
+        # Descarta o que já foi consumido antes de anexar o novo bloco
+        buffer = buffer[pos:] + bloco
+        pos = 0
+
+    def proximo_caractere():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _ESPACOS:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if fim_arquivo:
+                raise ValueError('Fim inesperado do arquivo JSON.')
+            ler_mais()
+
+    if proximo_caractere() != '[':
+        raise ValueError('O arquivo JSON deve conter uma lista no nível superior.')
+    pos += 1
+
+    if proximo_caractere() == ']':
+        return
+
+    while True:
+        proximo_caractere()
+        try:
+            item, fim = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if fim_arquivo:
+                raise
+            # Item incompleto: lê mais um bloco e tenta de novo
+            ler_mais()
+            continue
+        if not fim_arquivo and (fim == len(buffer) or buffer[fim] not in _FIM_ITEM):
+            # Um número no fim do buffer pode estar cortado ('12' de '1234', '1' de '1.5')
+            ler_mais()
+            continue
+        pos = fim
+        yield item
+
+        separador = proximo_caractere()
+        pos += 1
+        if separador == ']':
+            return
+        if separador != ',':
+            raise ValueError(f'Separador inesperado no JSON: {separador!r}')
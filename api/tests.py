@@ -1,3 +1,477 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import views
+from api.management.commands.gerar_previews import Command as GerarPreviewsCommand
+from api.models import (
+    Aluno, ConteudoArquivo, Curso, Documento, EmailPendente, EstatisticaInscricao, InscricaoAluno, Professor, User,
+    VagaCurso,
+)
+from api.referencia import invalidar_referencia, versao_referencia
+from api.relatorios import relatorio_inscricoes
+from api.roles import PapeisJWTAuthentication, PapeisRefreshToken, papeis_do_usuario
+from api.vagas import STATUS_OCUPAM_VAGA
+from api.views import PasswordResetRequestView
+
+
+def criar_usuario(email, grupo=None):
+    user = User.objects.create_user(email=email, password='senha-de-teste', first_name=email.split('@')[0])
+    if grupo:
+        user.groups.add(Group.objects.get_or_create(name=grupo)[0])
+    return user
+
+
+def criar_professor(numero):
+    user = criar_usuario(f'professor{numero}@teste.com', 'PROFESSOR')
+    return Professor.objects.create(user=user, siape=f'{numero:07d}', cpf=f'000.000.{numero:03d}-00')
+
+
+def criar_aluno(email):
+    return Aluno.objects.create(user=criar_usuario(email, 'ALUNO'), sexo='F', orgao_expedidor='SSP')
+
+
+def criar_curso(nome, criador=None, vagas_internas=20, vagas_externas=10, abertas=True):
+    agora = timezone.now()
+    inicio = agora - timedelta(days=1) if abertas else agora + timedelta(days=10)
+    return Curso.objects.create(
+        nome=nome, descricao='-', descricao_curta='-', carga_horaria=40, criador=criador,
+        vagas_internas=vagas_internas, vagas_externas=vagas_externas,
+        data_inicio_inscricoes=inicio, data_fim_inscricoes=inicio + timedelta(days=5),
+        data_inicio_curso=(agora + timedelta(days=20)).date(),
+        data_fim_curso=(agora + timedelta(days=60)).date(),
+    )
+
+
+class ListagemCursosConsultasTest(TestCase):
+    """A listagem de cursos faz o mesmo número de consultas, independente do tamanho da página."""
+
+    def setUp(self):
+        self.professores = [criar_professor(numero) for numero in range(1, 6)]
+        self.client = APIClient()
+        self.client.force_authenticate(criar_usuario('cca@teste.com', 'CCA'))
+
+    # Papéis do usuário, cursos e os prefetches do criador (professor, grupos, cursos criados)
+    CONSULTAS = 5
+
+    def listar(self, quantidade):
+        Curso.objects.all().delete()
+        for numero in range(quantidade):
+            criar_curso(f'Curso {numero:03d}', self.professores[numero % len(self.professores)])
+        # Usuário recarregado: os papéis são resolvidos de novo, como em cada requisição real
+        self.client.force_authenticate(User.objects.get(email='cca@teste.com'))
+        with self.assertNumQueries(self.CONSULTAS):
+            resposta = self.client.get('/cursos/', {'page_size': 200})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.json()['results']), quantidade)
+
+    def test_10_cursos(self):
+        self.listar(10)
+
+    def test_200_cursos(self):
+        self.listar(200)
+
+
+@override_settings(JWT_PAPEIS_NO_TOKEN=True)
+class PapeisNoTokenTest(TestCase):
+    def autenticar(self, token):
+        return PapeisJWTAuthentication().get_user(AccessToken(str(token)))
+
+    def test_papeis_vem_do_token(self):
+        aluno = criar_aluno('aluno@teste.com')
+        token = PapeisRefreshToken.for_user(aluno.user).access_token
+        user = self.autenticar(token)
+        with self.assertNumQueries(0):
+            papeis = papeis_do_usuario(user)
+        self.assertTrue(papeis.is_aluno)
+        self.assertEqual(papeis.aluno_id, aluno.pk)
+
+    def test_aluno_que_criou_o_perfil_depois_do_token(self):
+        user = criar_usuario('aluno@teste.com', 'ALUNO')
+        token = PapeisRefreshToken.for_user(user).access_token
+        aluno = Aluno.objects.create(user=user, sexo='F', orgao_expedidor='SSP')
+        self.assertEqual(papeis_do_usuario(self.autenticar(token)).aluno_id, aluno.pk)
+
+
+class ProfessorSemPerfilTest(TestCase):
+    """No grupo PROFESSOR, mas sem perfil de Professor: não vê nem cria cursos."""
+
+    def setUp(self):
+        criar_curso('Curso sem criador')
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(criar_usuario('professor@teste.com', 'PROFESSOR'))
+
+    def test_listagem_vazia(self):
+        resposta = self.cliente.get('/cursos/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['results'], [])
+
+    def test_nao_cria_curso(self):
+        resposta = self.cliente.post('/cursos/', {'nome': 'Novo'}, format='json')
+        self.assertEqual(resposta.status_code, 403)
+        self.assertEqual(Curso.objects.count(), 1)
+
+    @override_settings(JWT_PAPEIS_NO_TOKEN=True)
+    def test_perfil_criado_depois_do_token(self):
+        user = User.objects.get(email='professor@teste.com')
+        token = PapeisRefreshToken.for_user(user).access_token
+        professor = Professor.objects.create(user=user, siape='0000001', cpf='000.000.001-00')
+        papeis = papeis_do_usuario(PapeisJWTAuthentication().get_user(AccessToken(str(token))))
+        self.assertEqual(papeis.professor_id, professor.pk)
+
+
+class VagasTestMixin:
+    def inscrever(self, aluno, curso, tipo_vaga='EXTERNO'):
+        cliente = APIClient()
+        cliente.force_authenticate(aluno.user)
+        resposta = cliente.post('/inscricoes-aluno/', {'curso_id': curso.pk, 'tipo_vaga': tipo_vaga})
+        self.assertEqual(resposta.status_code, 201, resposta.content)
+        return InscricaoAluno.objects.get(pk=resposta.json()['id'])
+
+    def ocupadas(self, curso, grupo='EXTERNO'):
+        return VagaCurso.objects.get(curso=curso, tipo_vaga=grupo).ocupadas
+
+
+class LiberacaoDeVagaTest(VagasTestMixin, TestCase):
+    """A vaga volta ao curso por qualquer caminho de remoção da inscrição."""
+
+    def setUp(self):
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        self.aluno = criar_aluno('aluno1@teste.com')
+        self.inscricao = self.inscrever(self.aluno, self.curso)
+        self.assertEqual(self.ocupadas(self.curso), 1)
+
+    def test_remocao_pela_api(self):
+        cca = APIClient()
+        cca.force_authenticate(criar_usuario('cca@teste.com', 'CCA'))
+        self.assertEqual(cca.delete(f'/inscricoes-aluno/{self.inscricao.pk}/').status_code, 204)
+        self.assertEqual(self.ocupadas(self.curso), 0)
+
+    def test_conta_do_aluno_apagada(self):
+        # User -> Aluno -> inscrições, em cascata (como pela rota /usuario/me/ ou pelo admin)
+        self.aluno.user.delete()
+        self.assertEqual(self.ocupadas(self.curso), 0)
+
+    def test_curso_apagado(self):
+        self.curso.delete()
+        self.assertFalse(VagaCurso.objects.exists())
+
+
+class PromocaoListaEsperaTest(VagasTestMixin, TestCase):
+    """A vaga liberada vai para a cabeça da lista de espera, por qualquer caminho de remoção."""
+
+    def setUp(self):
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        self.primeira = self.inscrever(criar_aluno('aluno1@teste.com'), self.curso)
+        self.segunda = self.inscrever(criar_aluno('aluno2@teste.com'), self.curso)
+        self.terceira = self.inscrever(criar_aluno('aluno3@teste.com'), self.curso)
+        self.assertEqual(self.segunda.status, 'LISTA_ESPERA')
+
+    def assertPromoveuSegunda(self):
+        self.segunda.refresh_from_db()
+        self.terceira.refresh_from_db()
+        self.assertEqual(self.segunda.status, 'AGUARDANDO_VALIDACAO')
+        self.assertEqual(self.terceira.status, 'LISTA_ESPERA')
+        self.assertEqual(self.ocupadas(self.curso), 1)
+
+    def test_conta_do_aluno_apagada(self):
+        self.primeira.aluno.user.delete()
+        self.assertPromoveuSegunda()
+
+    def test_inscricao_apagada_pelo_admin(self):
+        InscricaoAluno.objects.get(pk=self.primeira.pk).delete()
+        self.assertPromoveuSegunda()
+
+    def test_inscricao_da_lista_de_espera_apagada(self):
+        self.segunda.aluno.user.delete()
+        self.terceira.refresh_from_db()
+        self.assertEqual(self.terceira.status, 'LISTA_ESPERA')
+        self.assertEqual(self.ocupadas(self.curso), 1)
+
+
+class InscricaoComDocumentosTest(TestCase):
+    """Inscrição, documentos e reserva da vaga são confirmados (ou desfeitos) juntos, com os arquivos."""
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        configuracao = override_settings(
+            MEDIA_ROOT=self.media.name, DOCUMENTO_UPLOAD_TEMP_DIR=os.path.join(self.media.name, 'tmp'),
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(criar_aluno('aluno@teste.com').user)
+
+    def inscrever(self):
+        return self.cliente.post('/inscricoes-aluno/', {
+            'curso_id': self.curso.pk, 'tipo_vaga': 'EXTERNO',
+            'arquivos_upload': [SimpleUploadedFile('rg.pdf', b'%PDF-1.4 rg', content_type='application/pdf')],
+        }, format='multipart')
+
+    def arquivos_guardados(self):
+        return [nome for _, _, nomes in os.walk(os.path.join(self.media.name, 'documentos')) for nome in nomes]
+
+    def test_inscricao_com_documento(self):
+        resposta = self.inscrever()
+        self.assertEqual(resposta.status_code, 201)
+        documento = resposta.json()['documentos'][0]
+        # Nada aponta para /media/, que não é servida
+        self.assertEqual(documento['arquivo'], documento['url_download'])
+        self.assertIn('/inscricoes-aluno/', documento['url_download'])
+        self.assertEqual(Documento.objects.get().conteudo.referencias, 1)
+        self.assertEqual(len(self.arquivos_guardados()), 1)
+        self.assertEqual(VagaCurso.objects.get(curso=self.curso, tipo_vaga='EXTERNO').ocupadas, 1)
+
+    def test_download_com_range(self):
+        url = self.inscrever().json()['documentos'][0]['url_download']
+
+        def baixar(intervalo):
+            resposta = self.cliente.get(url, HTTP_RANGE=intervalo)
+            return resposta.status_code, b''.join(resposta.streaming_content) if resposta.streaming else b''
+
+        self.assertEqual(baixar('bytes=0-3'), (206, b'%PDF'))
+        self.assertEqual(baixar('bytes=-2'), (206, b'rg'))
+        # Malformado (fim antes do início): ignorado, vai o arquivo inteiro
+        self.assertEqual(baixar('bytes=5-3'), (200, b'%PDF-1.4 rg'))
+        # Bem formado, mas começa depois do fim do arquivo
+        self.assertEqual(baixar('bytes=100-')[0], 416)
+
+    def test_falha_nos_documentos_desfaz_tudo_e_apaga_o_arquivo_novo(self):
+        with mock.patch.object(Documento.objects, 'bulk_create', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self.inscrever()
+        self.assertFalse(InscricaoAluno.objects.exists())
+        self.assertEqual(VagaCurso.objects.filter(ocupadas__gt=0).count(), 0)
+        self.assertFalse(ConteudoArquivo.objects.exists())
+        self.assertEqual(self.arquivos_guardados(), [])
+
+
+class VagasRestantesTest(VagasTestMixin, TestCase):
+    """Listagem e painel mostram as vagas restantes dos mesmos contadores que a reserva usa."""
+
+    def setUp(self):
+        cache.clear()
+        self.curso = criar_curso('Curso', vagas_internas=3, vagas_externas=2)
+        self.aluno = criar_aluno('aluno@teste.com')
+        self.inscrever(self.aluno, self.curso)
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.aluno.user)
+
+    def restantes(self, url):
+        curso = self.cliente.get(url).json()['results'][0]
+        return curso['vagas_internas_restantes'], curso['vagas_externas_restantes']
+
+    def test_listagem_e_painel_concordam_com_os_contadores(self):
+        # Estatísticas fora de sincronia não mudam as vagas mostradas
+        EstatisticaInscricao.objects.update(total=0)
+        self.assertEqual(self.restantes('/cursos/'), (3, 1))
+        self.assertEqual(self.restantes('/cursos/painel/'), (3, 1))
+
+    def test_curso_sem_contador_tem_todas_as_vagas(self):
+        VagaCurso.objects.filter(tipo_vaga='INTERNO').delete()
+        self.assertEqual(self.restantes('/cursos/'), (3, 1))
+
+
+class EstatisticasInscricaoTest(VagasTestMixin, TestCase):
+    """A tabela de estatísticas acompanha criação, mudança de status e remoção das inscrições."""
+
+    def totais(self):
+        return {
+            (linha.status, linha.tipo_vaga): linha.total
+            for linha in EstatisticaInscricao.objects.filter(curso=self.curso, total__gt=0)
+        }
+
+    def test_criacao_mudanca_de_status_e_remocao(self):
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        primeira = self.inscrever(criar_aluno('aluno1@teste.com'), self.curso)
+        segunda = self.inscrever(criar_aluno('aluno2@teste.com'), self.curso)
+        self.assertEqual(self.totais(), {('AGUARDANDO_VALIDACAO', 'EXTERNO'): 1, ('LISTA_ESPERA', 'EXTERNO'): 1})
+
+        primeira.status = 'CONFIRMADA'
+        primeira.save()
+        self.assertEqual(self.totais(), {('CONFIRMADA', 'EXTERNO'): 1, ('LISTA_ESPERA', 'EXTERNO'): 1})
+
+        # A vaga liberada promove a segunda (UPDATE em lote, ver api/vagas.py)
+        primeira.delete()
+        self.assertEqual(self.totais(), {('AGUARDANDO_VALIDACAO', 'EXTERNO'): 1})
+        segunda.refresh_from_db()
+        segunda.delete()
+        self.assertEqual(self.totais(), {})
+
+    def test_relatorio_sem_periodo_usa_a_tabela(self):
+        cache.clear()
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        self.inscrever(criar_aluno('aluno1@teste.com'), self.curso)
+        self.inscrever(criar_aluno('aluno2@teste.com'), self.curso)
+        cca = APIClient()
+        cca.force_authenticate(criar_usuario('cca@teste.com', 'CCA'))
+        hoje = timezone.localdate().isoformat()
+        with self.assertNumQueries(2):
+            geral = relatorio_inscricoes()
+        do_periodo = cca.get('/relatorios/inscricoes/', {'de': hoje, 'ate': hoje}).json()
+
+        curso = geral['por_curso'][0]
+        self.assertEqual(curso['por_tipo_vaga'], {'EXTERNO': {
+            'inscricoes': 2, 'aguardando_validacao': 1, 'confirmadas': 0, 'lista_espera': 1, 'canceladas': 0,
+        }})
+        self.assertEqual(geral['por_curso'], do_periodo['por_curso'])
+        self.assertEqual(geral['totais'], do_periodo['totais'])
+
+
+class ValidacaoInscricaoTest(VagasTestMixin, TestCase):
+    def setUp(self):
+        self.curso = criar_curso('Curso', vagas_externas=1)
+        self.inscricao = self.inscrever(criar_aluno('aluno1@teste.com'), self.curso)
+        self.cca = APIClient()
+        self.cca.force_authenticate(criar_usuario('cca@teste.com', 'CCA'))
+
+    def validar(self, aprovar):
+        return self.cca.post(f'/inscricoes-aluno/{self.inscricao.pk}/validar/', {'aprovar': aprovar}, format='json')
+
+    def test_aprovar(self):
+        resposta = self.validar(True)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['status'], 'CONFIRMADA')
+
+    def test_inscricao_ja_decidida(self):
+        self.validar(True)
+        self.assertEqual(self.validar(False).status_code, 400)
+        self.inscricao.refresh_from_db()
+        self.assertEqual(self.inscricao.status, 'CONFIRMADA')
+
+    def test_decidida_por_outra_requisicao_no_meio(self):
+        # A inscrição sai de AGUARDANDO_VALIDACAO depois do get_object() e antes do UPDATE
+        validar_em_lote = views.validar_em_lote
+
+        def concorrente(inscricoes, decisoes):
+            InscricaoAluno.objects.filter(pk=self.inscricao.pk).update(status='CONFIRMADA')
+            return validar_em_lote(inscricoes, decisoes)
+
+        with mock.patch.object(views, 'validar_em_lote', side_effect=concorrente):
+            self.assertEqual(self.validar(False).status_code, 409)
+        self.assertEqual(self.ocupadas(self.curso), 1)
+
+
+class VersaoReferenciaTest(TestCase):
+    """A versão dos dados de referência não é descartada quando o cache 'default' enche."""
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        arquivo = 'django.core.cache.backends.filebased.FileBasedCache'
+        configuracao = override_settings(CACHES={
+            # CULL_FREQUENCY=1: ao passar do limite, o 'default' apaga tudo
+            'default': {'BACKEND': arquivo, 'LOCATION': pasta.name,
+                        'OPTIONS': {'MAX_ENTRIES': 5, 'CULL_FREQUENCY': 1}},
+            'referencia': {'BACKEND': arquivo, 'LOCATION': os.path.join(pasta.name, 'referencia'), 'TIMEOUT': None},
+        })
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_versao_sobrevive_ao_default_cheio(self):
+        versao = versao_referencia()
+        for numero in range(20):
+            cache.set(f'painel:curso:{numero}', numero)
+        self.assertEqual(versao_referencia(), versao)
+
+    def test_import_data_troca_a_versao(self):
+        versao = versao_referencia()
+        invalidar_referencia()
+        self.assertNotEqual(versao_referencia(), versao)
+
+
+class GerarPreviewsTest(TestCase):
+    """Um lote do 'gerar_previews' faz 1 SELECT e 1 UPDATE por conteúdo."""
+
+    class PoolSemProcessos:
+        # Pool de mentira: cada arquivo já "vira" um JPEG, sem subprocessos
+        def map(self, funcao, caminhos):
+            return [(b'jpeg', None) for _ in caminhos]
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        configuracao = override_settings(MEDIA_ROOT=media.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_consultas_por_lote(self):
+        for numero in range(3):
+            ConteudoArquivo.objects.create(sha256=f'{numero:064d}', arquivo=f'documentos/{numero}.pdf', tamanho=1)
+        comando = GerarPreviewsCommand(stdout=StringIO())
+        with self.assertNumQueries(1 + 3):
+            self.assertEqual(comando.processar_lote(self.PoolSemProcessos(), 10), 3)
+        self.assertEqual(ConteudoArquivo.objects.filter(status_preview='PRONTO').count(), 3)
+
+
+class RedefinicaoSenhaTest(TestCase):
+    def pedir(self, email):
+        # Chamada direta à view: no roteamento, 'usuario/<pk>/' do router vem antes desta rota
+        requisicao = APIRequestFactory().post('/usuario/reset-password/', {'email': email})
+        return PasswordResetRequestView.as_view()(requisicao)
+
+    @override_settings(EMAIL_HOST_USER=None, DEFAULT_FROM_EMAIL='fic@teste.com')
+    def test_sem_email_host_user_usa_o_remetente_padrao(self):
+        criar_usuario('aluno@teste.com')
+        self.assertEqual(self.pedir('aluno@teste.com').status_code, 200)
+        self.assertEqual(EmailPendente.objects.get().remetente, 'fic@teste.com')
+
+    def test_resposta_igual_para_conta_inexistente(self):
+        self.assertEqual(self.pedir('ninguem@teste.com').status_code, 200)
+        self.assertFalse(EmailPendente.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Concorrência real precisa do PostgreSQL (o SQLite serializa as escritas).')
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ReservaConcorrenteTest(TransactionTestCase):
+    """
+    Centenas de alunos disputando a última vaga ao mesmo tempo: uma reserva, o
+    resto na lista de espera. Cada thread abre uma conexão, então o Postgres
+    precisa de max_connections acima de ALUNOS (o fic_db do docker-compose
+    sobe com 300). Como rodar: ver "Testes" no Readme.
+    """
+    ALUNOS = int(os.getenv('TESTE_CONCORRENCIA_ALUNOS', 200))
+
+    def test_ultima_vaga_nao_e_vendida_duas_vezes(self):
+        curso = criar_curso('Curso disputado', vagas_externas=1)
+        alunos = [criar_aluno(f'aluno{numero}@teste.com') for numero in range(self.ALUNOS)]
+        largada = threading.Barrier(self.ALUNOS)
+        respostas = []
+
+        def inscrever(aluno):
+            try:
+                cliente = APIClient()
+                cliente.force_authenticate(aluno.user)
+                largada.wait()
+                resposta = cliente.post('/inscricoes-aluno/', {'curso_id': curso.pk, 'tipo_vaga': 'EXTERNO'})
+                respostas.append(resposta.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=inscrever, args=(aluno,)) for aluno in alunos]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(respostas, [201] * self.ALUNOS)
+        contador = VagaCurso.objects.get(curso=curso, tipo_vaga='EXTERNO')
+        self.assertLessEqual(contador.ocupadas, contador.capacidade)
+        self.assertEqual(contador.ocupadas, 1)
+        inscricoes = InscricaoAluno.objects.filter(curso=curso)
+        self.assertEqual(inscricoes.filter(status__in=STATUS_OCUPAM_VAGA).count(), 1)
+        self.assertEqual(inscricoes.filter(status='LISTA_ESPERA').count(), self.ALUNOS - 1)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Espaço para os campos de texto do formulário (curso_id, tipo_vaga...) e os boundaries
+FOLGA_FORMULARIO = 64 * 1024
+
+
+class UploadMuitoGrande(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Os arquivos enviados excedem o tamanho permitido.'
+    default_code = 'upload_muito_grande'
+
+
+class DocumentoTemporario(TemporaryUploadedFile):
+    """Arquivo temporário criado em DOCUMENTO_UPLOAD_TEMP_DIR em vez do /tmp do sistema."""
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        arquivo = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=settings.DOCUMENTO_UPLOAD_TEMP_DIR)
+        UploadedFile.__init__(self, arquivo, name, content_type, size, charset, content_type_extra)
+
+
+class DocumentoUploadHandler(TemporaryFileUploadHandler):
+    """
+    Recebe os documentos da inscrição em blocos:
+    - recusa a requisição pelo Content-Length, antes de ler o corpo, se ela já
+      passa do limite por inscrição;
+    - interrompe no bloco em que um arquivo (ou a soma deles) passa do limite;
+    - calcula o SHA-256 enquanto grava o arquivo temporário.
+    O temporário fica em DOCUMENTO_UPLOAD_TEMP_DIR, dentro de MEDIA_ROOT, para que o
+    storage só precise renomeá-lo (sem copiar) ao salvar o Documento.
+    """
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.total_recebido = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > settings.INSCRICAO_UPLOAD_MAXIMO + FOLGA_FORMULARIO:
+            raise UploadMuitoGrande(
+                f'O total de documentos de uma inscrição é limitado a {filesizeformat(settings.INSCRICAO_UPLOAD_MAXIMO)}.'
+            )
+        os.makedirs(settings.DOCUMENTO_UPLOAD_TEMP_DIR, exist_ok=True)
+
+    def new_file(self, *args, **kwargs):
+        FileUploadHandler.new_file(self, *args, **kwargs)
+        self.file = DocumentoTemporario(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.sha256 = hashlib.sha256()
+        self.tamanho = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.tamanho += len(raw_data)
+        self.total_recebido += len(raw_data)
+        if self.tamanho > settings.DOCUMENTO_TAMANHO_MAXIMO:
+            self.upload_interrupted()
+            raise UploadMuitoGrande(
+                f'O arquivo "{self.file_name}" excede o limite de {filesizeformat(settings.DOCUMENTO_TAMANHO_MAXIMO)}.'
+            )
+        if self.total_recebido > settings.INSCRICAO_UPLOAD_MAXIMO:
+            self.upload_interrupted()
+            raise UploadMuitoGrande(
+                f'O total de documentos de uma inscrição é limitado a {filesizeformat(settings.INSCRICAO_UPLOAD_MAXIMO)}.'
+            )
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        arquivo = super().file_complete(file_size)
+        arquivo.sha256 = self.sha256.hexdigest()
+        return arquivo
@@ -0,0 +1,187 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from api.models import Curso, InscricaoAluno, VagaCurso
+from api.estatisticas import registrar_transicoes
+from api.notificacoes import registrar_mudancas
+
+Status = InscricaoAluno.StatusInscricao
+TipoVaga = InscricaoAluno.TipoVaga
+
+# Status de inscrição que ocupam uma vaga do curso
+STATUS_OCUPAM_VAGA = (Status.AGUARDANDO_VALIDACAO, Status.CONFIRMADA)
+
+
+def grupo_vaga(tipo_vaga):
+    """Tipo de vaga cujo contador é usado. 'NI' concorre às vagas externas."""
+    return TipoVaga.INTERNO if tipo_vaga == TipoVaga.INTERNO else TipoVaga.EXTERNO
+
+
+def tipos_do_grupo(grupo):
+    """Tipos de vaga de inscrição que consomem o contador 'grupo'."""
+    if grupo == TipoVaga.INTERNO:
+        return [TipoVaga.INTERNO]
+    return [TipoVaga.EXTERNO, TipoVaga.NI]
+
+
+def capacidade(curso, grupo):
+    return curso.vagas_internas if grupo == TipoVaga.INTERNO else curso.vagas_externas
+
+
+def sincronizar_capacidade(curso):
+    """
+    Mantém a capacidade dos contadores igual às vagas do curso e, se sobrarem
+    vagas, chama a lista de espera. Chamado sempre que um Curso é salvo.
+    """
+    with transaction.atomic():
+        for grupo in (TipoVaga.INTERNO, TipoVaga.EXTERNO):
+            atualizados = VagaCurso.objects.filter(curso=curso, tipo_vaga=grupo).update(
+                capacidade=capacidade(curso, grupo)
+            )
+            if not atualizados:
+                _criar_contador(curso, grupo)
+            preencher_vagas_livres(curso.pk, grupo)
+
+
+def _criar_contador(curso, grupo):
+    """Cria o contador contando as inscrições que já ocupam vaga (cursos anteriores ao contador)."""
+    ocupadas = InscricaoAluno.objects.filter(
+        curso=curso, tipo_vaga__in=tipos_do_grupo(grupo), status__in=STATUS_OCUPAM_VAGA
+    ).count()
+    VagaCurso.objects.get_or_create(
+        curso=curso, tipo_vaga=grupo,
+        defaults={'capacidade': capacidade(curso, grupo), 'ocupadas': ocupadas},
+    )
+
+
+def reservar_vaga(curso_id, tipo_vaga):
+    """
+    Tenta ocupar uma vaga com um único UPDATE condicional:
+        UPDATE ... SET ocupadas = ocupadas + 1 WHERE ocupadas < capacidade
+    Retorna False se não há vagas. Deve rodar dentro da transação que grava a
+    inscrição; a linha do contador fica bloqueada apenas até o commit, então
+    convém chamá-la como último passo antes dele.
+    """
+    grupo = grupo_vaga(tipo_vaga)
+    contador = VagaCurso.objects.filter(curso_id=curso_id, tipo_vaga=grupo)
+    if contador.filter(ocupadas__lt=F('capacidade')).update(ocupadas=F('ocupadas') + 1):
+        return True
+    if contador.exists():
+        return False
+    _criar_contador(Curso.objects.get(pk=curso_id), grupo)
+    return contador.filter(ocupadas__lt=F('capacidade')).update(ocupadas=F('ocupadas') + 1) > 0
+
+
+def fila_de_espera(curso_id, grupo):
+    """
+    Inscrições na lista de espera do curso/tipo de vaga, em ordem de chegada.
+    Percorre o índice parcial (curso, data_inscricao, id) WHERE status = LISTA_ESPERA,
+    então pegar a cabeça da fila não varre a tabela de inscrições.
+    """
+    return InscricaoAluno.objects.filter(
+        curso_id=curso_id, status=Status.LISTA_ESPERA, tipo_vaga__in=tipos_do_grupo(grupo),
+    ).order_by('data_inscricao', 'id')
+
+
+def promover_da_fila(curso_id, grupo, quantidade):
+    """
+    Move as 'quantidade' primeiras inscrições da fila para AGUARDANDO_VALIDACAO.
+    A vaga que elas passam a ocupar já deve estar contabilizada pelo chamador.
+    SKIP LOCKED evita que duas liberações simultâneas promovam a mesma inscrição.
+    Retorna os ids promovidos.
+    """
+    if quantidade <= 0:
+        return []
+    fila = list(
+        fila_de_espera(curso_id, grupo).select_for_update(skip_locked=True).values_list('id', 'tipo_vaga')[:quantidade]
+    )
+    promovidos = [pk for pk, _ in fila]
+    if promovidos:
+        InscricaoAluno.objects.filter(pk__in=promovidos).update(status=Status.AGUARDANDO_VALIDACAO)
+        registrar_mudancas((pk, Status.AGUARDANDO_VALIDACAO) for pk in promovidos)
+        registrar_transicoes(
+            (curso_id, tipo_vaga, Status.LISTA_ESPERA, Status.AGUARDANDO_VALIDACAO) for _, tipo_vaga in fila
+        )
+    return promovidos
+
+
+def liberar_vagas(curso_id, tipo_vaga, quantidade=1):
+    """
+    Devolve 'quantidade' vagas (inscrições canceladas ou removidas).
+    Cada vaga vai primeiro para a cabeça da lista de espera; só as que sobrarem
+    voltam ao contador. Deve rodar na mesma transação que mudou as inscrições.
+    Retorna os ids promovidos da lista de espera.
+    """
+    if quantidade <= 0:
+        return []
+    grupo = grupo_vaga(tipo_vaga)
+    promovidos = promover_da_fila(curso_id, grupo, quantidade)
+    sobra = quantidade - len(promovidos)
+    if sobra:
+        VagaCurso.objects.filter(curso_id=curso_id, tipo_vaga=grupo).update(
+            ocupadas=Greatest(F('ocupadas') - sobra, 0)
+        )
+    return promovidos
+
+
+def preencher_vagas_livres(curso_id, grupo):
+    """
+    Ocupa as vagas livres com a lista de espera (ex.: o curso ganhou mais vagas).
+    """
+    contador = VagaCurso.objects.select_for_update().filter(curso_id=curso_id, tipo_vaga=grupo).first()
+    if contador is None or contador.ocupadas >= contador.capacidade:
+        return []
+    promovidos = promover_da_fila(curso_id, grupo, contador.capacidade - contador.ocupadas)
+    if promovidos:
+        VagaCurso.objects.filter(pk=contador.pk).update(ocupadas=F('ocupadas') + len(promovidos))
+    return promovidos
+
+
+def validar_em_lote(inscricoes, decisoes):
+    """
+    Aplica as decisões do CCA ({id: aprovar}) em uma transação:
+    - um SELECT ... FOR UPDATE das inscrições ainda AGUARDANDO_VALIDACAO;
+    - um único UPDATE ... WHERE status = 'AGUARDANDO_VALIDACAO' com CASE por id;
+    - as vagas das recusadas vão para a lista de espera (ou voltam ao contador),
+      agrupadas por curso/tipo de vaga.
+    Aprovar não muda a ocupação: a vaga já foi reservada na inscrição.
+    Cada mudança gera um evento de notificação para o aluno (api/notificacoes.py)
+    e atualiza as estatísticas do curso (api/estatisticas.py).
+    'inscricoes' é o queryset que limita o que o usuário pode validar.
+    Retorna ({id: novo_status} das inscrições alteradas, ids promovidos da lista de espera).
+    """
+    with transaction.atomic():
+        pendentes = list(
+            inscricoes.select_related(None).prefetch_related(None).select_for_update()
+            .filter(pk__in=list(decisoes), status=Status.AGUARDANDO_VALIDACAO)
+            .values_list('id', 'curso_id', 'tipo_vaga')
+        )
+        if not pendentes:
+            return {}, []
+
+        novos_status = {
+            pk: Status.CONFIRMADA if decisoes[pk] else Status.CANCELADA for pk, _, _ in pendentes
+        }
+        aprovadas = [pk for pk, novo in novos_status.items() if novo == Status.CONFIRMADA]
+        InscricaoAluno.objects.filter(
+            pk__in=list(novos_status), status=Status.AGUARDANDO_VALIDACAO
+        ).update(status=Case(
+            When(pk__in=aprovadas, then=Value(Status.CONFIRMADA)),
+            default=Value(Status.CANCELADA),
+        ))
+        registrar_mudancas(novos_status.items())
+        registrar_transicoes(
+            (curso_id, tipo_vaga, Status.AGUARDANDO_VALIDACAO, novos_status[pk]) for pk, curso_id, tipo_vaga in pendentes
+        )
+
+        liberadas = Counter(
+            (curso_id, grupo_vaga(tipo_vaga))
+            for pk, curso_id, tipo_vaga in pendentes if novos_status[pk] == Status.CANCELADA
+        )
+        promovidos = []
+        for (curso_id, grupo), quantidade in liberadas.items():
+            promovidos += liberar_vagas(curso_id, grupo, quantidade)
+    return novos_status, promovidos
@@ -3,33 +3,50 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework import serializers
 
 from api.permissions_custom import IsProfessorUser, IsAdminUser, IsCCAUser, IsAlunoUser
+from api.mixins import CamposEsparsosViewMixin
+from api.pagination import CursoCursorPagination, InscricaoCursorPagination
+from api.roles import papeis_do_usuario
+from api.indice_municipios import obter_indice
+from api.vagas import validar_em_lote
+from api.emails import enfileirar_email
+from api.uploads import DocumentoUploadHandler
+from api.downloads import resposta_arquivo
+from api.painel import dados_dos_cursos
+from api.relatorios import relatorio_inscricoes
+from api.metricas_banco import metricas_conexoes
+from api.exportacao import gerar_csv, gerar_xlsx, gerar_zip, nome_seguro
+from api.referencia import (
+    dados_referencia, etag_da_requisicao, resposta_nao_modificada, resposta_referencia
+)
 
-from django.conf import settings
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
-from django.http import Http404
-from django.db import transaction
+from django.utils.http import content_disposition_header, urlsafe_base64_decode, urlsafe_base64_encode
+from django.core.files.storage import default_storage
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import FilteredRelation, Prefetch, Q
 
-from api.models import (User, Estado, Municipio, Aluno, Professor, Curso, InscricaoAluno)
+from api.models import (User, Estado, Municipio, Aluno, Professor, Curso, InscricaoAluno, Documento)
 from api.serializer import (
     AlunoRegistroSerializer, AlunoPerfilSerializer, ProfessorSerializer,
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer, 
     ChangePasswordSerializer, UserSerializer, UserUpdateSerializer,
     CursoSerializer, InscricaoAlunoSerializer,PasswordResetSerializer,
     MunicipioSerializer, EstadoSerializer, AlunoReadOnlySerializer, 
-    CursoBasicSerializer
+    CursoBasicSerializer, ValidacaoLoteSerializer
 )
 
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -49,44 +66,59 @@ class MeView(APIView):
         return Response(data)
     
 class EstadoView(APIView): 
+    """
+    Lista os estados. Os dados ficam em cache até o próximo import_data e a
+    resposta traz ETag/Cache-Control, respondendo 304 quando o cliente já os tem.
+    """
     def get(self, request):
         try:
-            estados=Estado.objects.all()
-            serializer=EstadoSerializer(estados, many=True)
-            return Response(serializer.data, status.HTTP_200_OK)
+            etag, estados = dados_referencia(
+                'estados', lambda: list(EstadoSerializer(Estado.objects.all(), many=True).data)
+            )
         except Exception as e:
             logging.info(f'erro:{e}')
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return resposta_nao_modificada(request, etag) or resposta_referencia(request, etag, estados)
 
 
 class MunicipioViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Endpoint para listar Municípios.
     Pode ser filtrado por estado_id e por um termo de busca (search).
+    A busca usa o índice em memória (ignora acentos: 'sao' encontra 'São Paulo').
     URL: /municipios/?estado_id=5&search=forta
     """
     serializer_class = MunicipioSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # A busca já devolve no máximo 20 resultados (autocomplete).
+    pagination_class = None
 
-    def get_queryset(self):
+    def list(self, request, *args, **kwargs):
         """
-        Esta função é o coração do filtro. Ela lê os parâmetros da URL.
+        O resultado de uma mesma busca só muda com um novo import_data, então a
+        ETag depende apenas da versão dos dados de referência e da URL:
+        um 304 é respondido sem nenhuma consulta ao banco.
         """
-        queryset = Municipio.objects.all()
-        
-        # 1. Filtra por Estado (se o parâmetro 'estado_id' for enviado)
-        estado_id = self.request.query_params.get('estado_id', None)
+        etag = etag_da_requisicao(request)
+        nao_modificado = resposta_nao_modificada(request, etag)
+        if nao_modificado is not None:
+            return nao_modificado
+
+        estado_id = request.query_params.get('estado_id', None)
         if estado_id is not None:
-            queryset = queryset.filter(estado_id=estado_id)
+            try:
+                estado_id = int(estado_id)
+            except ValueError:
+                raise ValidationError({'estado_id': 'Deve ser um número inteiro.'})
 
-        # 2. Filtra pelo termo de busca (se o parâmetro 'search' for enviado)
-        search_term = self.request.query_params.get('search', None)
-        if search_term:
-            # '__icontains' faz a busca "contém" sem diferenciar maiúsculas/minúsculas
-            queryset = queryset.filter(nome__icontains=search_term)
-        
-        # 3. Ordena e limita o número de resultados para não sobrecarregar
-        return queryset.order_by('nome')[:20]
+        municipios = obter_indice().buscar(request.query_params.get('search', None), estado_id)
+        return resposta_referencia(request, etag, municipios)
+
+    def get_queryset(self):
+        """
+        Usado apenas no detalhe (/municipios/{id}/); a listagem vem do índice.
+        """
+        return Municipio.objects.select_related('estado')
 
 
 
@@ -98,17 +130,20 @@ class FormOptionsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
+        etag, options_data = dados_referencia('form-options:aluno-perfil', self.montar_opcoes)
+        return resposta_nao_modificada(request, etag) or resposta_referencia(request, etag, options_data)
+
+    @staticmethod
+    def montar_opcoes():
         # Pega as opções diretamente da classe do modelo Aluno
         sexo_options = [{'value': choice[0], 'label': choice[1]} for choice in Aluno.SexoChoices.choices]
         orgao_expedidor_options = [{'value': choice[0], 'label': choice[1]} for choice in Aluno.OrgaoExpedidor.choices]
         
         # Monta a resposta em um JSON organizado
-        options_data = {
+        return {
             'sexo': sexo_options,
             'orgao_expedidor': orgao_expedidor_options,
         }
-        
-        return Response(options_data)
 
 class AlunoRegistroView(generics.CreateAPIView):
     """Endpoint público para que novos alunos possam se registrar."""
@@ -116,13 +151,16 @@ class AlunoRegistroView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
-class AlunoViewSet(viewsets.ReadOnlyModelViewSet):
+class AlunoViewSet(CamposEsparsosViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para que o CCA/Admin possa VISUALIZAR os perfis dos alunos.
-    - GET /api/alunos/ (lista todos os alunos)
+    - GET /api/alunos/ (lista todos os alunos, paginada por cursor)
     - GET /api/alunos/{id}/ (busca um aluno específico)
+    - GET /api/alunos/?fields=id,cpf (carrega e serializa só os campos pedidos)
     """
-    queryset = Aluno.objects.all().select_related('user') 
+    queryset = Aluno.objects.select_related(
+        'user', 'uf_expedidor', 'naturalidade__estado', 'cidade__estado'
+    ).prefetch_related('user__groups')
     serializer_class = AlunoReadOnlySerializer
     permission_classes = [IsCCAUser]
 
@@ -177,12 +215,12 @@ class AlunoPerfilView(APIView):
 
 
 
-class ProfessorViewSet(viewsets.ModelViewSet):
+class ProfessorViewSet(CamposEsparsosViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para o CCA gerenciar Professores.
     Agora usa um único serializer principal para todas as ações.
     """
-    queryset = Professor.objects.select_related('user').all()
+    queryset = Professor.objects.com_detalhes()
     
     # Define o serializer padrão para o ViewSet
     serializer_class = ProfessorSerializer
@@ -238,12 +276,12 @@ class PasswordResetRequestView(APIView):
             # Montar link de reset
             reset_link = f"http://localhost:8080/usuario/reset-password-confirm/{uid}/{token}/"
 
-            # Enviar e-mail
-            send_mail(
-                subject="Seu Link de Redefinição de Senha",
-                message=f"Olá,\n\nClique no link para redefinir sua senha: {reset_link}\n\nObrigado.",
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[user.email]
+            # Coloca o e-mail na caixa de saída; o worker 'enviar_emails' faz o envio.
+            # Assim a resposta não espera o SMTP (nem revela, pelo tempo, se a conta existe).
+            enfileirar_email(
+                assunto="Seu Link de Redefinição de Senha",
+                mensagem=f"Olá,\n\nClique no link para redefinir sua senha: {reset_link}\n\nObrigado.",
+                destinatarios=[user.email],
             )
         except User.DoesNotExist:
             # Não informar se o usuário existe ou não
@@ -353,11 +391,13 @@ class UserViewSet(mixins.DestroyModelMixin,
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
-class CursoViewSet(viewsets.ModelViewSet):
+class CursoViewSet(CamposEsparsosViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para Cursos, com status automático e permissões por perfil.
+    A listagem é paginada por cursor e aceita '?fields=' para projeções enxutas.
     """
     serializer_class = CursoSerializer
+    pagination_class = CursoCursorPagination
     
     def get_queryset(self):
         """
@@ -369,14 +409,54 @@ class CursoViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Curso.objects.none()
 
-        if user.groups.filter(name='PROFESSOR').exists():
-            return Curso.objects.filter(criador=user.professor)
+        # 'com_detalhes' mantém constante o número de consultas da listagem;
+        # 'status_efetivo' é o status pelas datas, mesmo se o agendador estiver atrasado;
+        # as vagas restantes vêm dos contadores de vagas na mesma consulta
+        agora = timezone.now()
+        cursos = Curso.objects.com_detalhes().com_status_efetivo(agora).com_vagas_restantes()
+        papeis = papeis_do_usuario(user)
+
+        if papeis.is_professor:
+            # No grupo mas sem perfil de Professor: criador_id=None listaria os cursos sem criador
+            if papeis.professor_id is None:
+                return Curso.objects.none()
+            return cursos.filter(criador_id=papeis.professor_id)
         
-        if user.groups.filter(name='CCA').exists():
-            return Curso.objects.all()
+        if papeis.is_cca:
+            return cursos.all()
         
         # Alunos (ou qualquer outro grupo) só veem cursos com inscrições abertas.
-        return Curso.objects.filter(status=Curso.StatusChoices.INSCRICOES_ABERTAS)
+        return cursos.com_inscricoes_abertas(agora)
+
+    @action(detail=False, methods=['get'], url_path='painel')
+    def painel(self, request):
+        """
+        Painel do aluno: os cursos visíveis para ele (para alunos, os com
+        inscrições abertas) com as vagas restantes e a inscrição do próprio
+        aluno em cada um, em uma única resposta paginada.
+        - 1 consulta por requisição: cursos + inscrição do aluno (LEFT JOIN);
+        - dados do curso e vagas restantes em cache por alguns segundos por curso
+          (ver api/painel.py), buscados com uma única consulta quando faltam.
+        """
+        aluno_id = papeis_do_usuario(request.user).aluno_id
+        cursos = self.get_queryset().prefetch_related(None).annotate(
+            minha=FilteredRelation('inscricaoaluno', condition=Q(inscricaoaluno__aluno_id=aluno_id)),
+        ).values('id', 'nome', 'status_efetivo', 'minha__id', 'minha__status')
+
+        pagina = self.paginate_queryset(cursos)
+        dados = dados_dos_cursos([curso['id'] for curso in pagina])
+        nomes_status = dict(InscricaoAluno.StatusInscricao.choices)
+
+        resultados = []
+        for curso in pagina:
+            item = dict(dados[curso['id']], status=curso['status_efetivo'])
+            item['minha_inscricao'] = None if curso['minha__id'] is None else {
+                'id': curso['minha__id'],
+                'status': curso['minha__status'],
+                'status_display': nomes_status.get(curso['minha__status'], curso['minha__status']),
+            }
+            resultados.append(item)
+        return self.get_paginated_response(resultados)
 
     def get_permissions(self):
         """
@@ -386,7 +466,7 @@ class CursoViewSet(viewsets.ModelViewSet):
             permission_classes = [IsProfessorUser]
         
 
-        elif self.action in ['list', 'retrieve']:
+        elif self.action in ['list', 'retrieve', 'painel']:
             permission_classes = [permissions.IsAuthenticated]
         
         else:
@@ -399,20 +479,33 @@ class CursoViewSet(viewsets.ModelViewSet):
         Ao criar um curso ('POST'), o sistema define o professor logado como o 'criador'.
         O status será 'AGENDADO' por padrão, conforme definido no modelo.
         """
-        # A permissão 'IsProfessorUser' já garante que request.user.professor existe.
-        serializer.save(criador=self.request.user.professor)
+        # A permissão 'IsProfessorUser' já barra quem não tem perfil de professor;
+        # a checagem fica aqui também para um curso nunca ser criado sem criador.
+        professor_id = papeis_do_usuario(self.request.user).professor_id
+        if professor_id is None:
+            raise PermissionDenied('Complete seu perfil de professor antes de criar cursos.')
+        serializer.save(criador_id=professor_id)
 
 
 
 
-class InscricaoAlunoViewSet(viewsets.ModelViewSet):
+class InscricaoAlunoViewSet(CamposEsparsosViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar as inscrições de alunos.
     - Aluno: pode criar e listar/ver as SUAS próprias inscrições.
     - Admin/CCA: pode listar/ver TODAS as inscrições e validá-las.
+    A listagem é paginada por cursor, em ordem de inscrição.
     """
     serializer_class = InscricaoAlunoSerializer
+    pagination_class = InscricaoCursorPagination
     parser_classes = (MultiPartParser, FormParser) # Essencial para o upload de arquivos
+
+    def initial(self, request, *args, **kwargs):
+        # Os documentos são gravados em blocos, com limite de tamanho e SHA-256 (api/uploads.py).
+        # Precisa ser definido antes de qualquer leitura do corpo da requisição.
+        if self.action == 'create':
+            request._request.upload_handlers = [DocumentoUploadHandler(request._request)]
+        super().initial(request, *args, **kwargs)
     
     def get_queryset(self):
         """
@@ -421,7 +514,10 @@ class InscricaoAlunoViewSet(viewsets.ModelViewSet):
         - Aplica a segurança para garantir que cada usuário só veja o que pode.
         """
         user = self.request.user
-        queryset = InscricaoAluno.objects.all() # Começa com todas as inscrições
+        # Começa com todas as inscrições, já trazendo o que o serializer aninha
+        queryset = InscricaoAluno.objects.select_related('aluno__user', 'curso').prefetch_related(
+            Prefetch('documentos', queryset=Documento.objects.select_related('conteudo'))
+        )
 
         # --- A NOVA LÓGICA DE FILTRO POR CURSO ---
         # Pega o 'curso_id' dos parâmetros da URL (ex: ?curso_id=5)
@@ -431,11 +527,12 @@ class InscricaoAlunoViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(curso_id=curso_id)
 
         # --- A LÓGICA DE SEGURANÇA QUE JÁ TINHAMOS ---
-        if hasattr(user, 'perfil_aluno'):
+        papeis = papeis_do_usuario(user)
+        if papeis.aluno_id is not None:
             # Se for um aluno, ele SÓ pode ver as SUAS inscrições, mesmo que tente filtrar por curso.
-            return queryset.filter(aluno=user.perfil_aluno)
+            return queryset.filter(aluno_id=papeis.aluno_id)
         
-        if user.is_staff or user.groups.filter(name='CCA').exists():
+        if user.is_staff or papeis.is_cca:
             # Se for CCA, ele vê a lista já filtrada por curso (se o parâmetro foi passado).
             return queryset
         
@@ -446,7 +543,7 @@ class InscricaoAlunoViewSet(viewsets.ModelViewSet):
         if self.action == 'create':
             # Apenas Alunos podem se inscrever.
             self.permission_classes = [IsAlunoUser]
-        elif self.action in ['list', 'retrieve']:
+        elif self.action in ['list', 'retrieve', 'baixar_documento', 'preview_documento']:
             # Qualquer usuário autenticado pode TENTAR listar (o get_queryset fará a segurança).
             self.permission_classes = [permissions.IsAuthenticated]
         else: # validar_inscricao, update, destroy, etc.
@@ -459,7 +556,169 @@ class InscricaoAlunoViewSet(viewsets.ModelViewSet):
         A única responsabilidade da view é injetar o 'aluno' logado
         antes de salvar. Toda a validação já foi feita pelo serializer.
         """
-        serializer.save(aluno=self.request.user.perfil_aluno)
+        serializer.save(aluno_id=papeis_do_usuario(self.request.user).aluno_id)
+
+    @action(detail=True, methods=['get'], url_path=r'documentos/(?P<documento_id>\d+)/download')
+    def baixar_documento(self, request, pk=None, documento_id=None):
+        """
+        Download de um documento da inscrição. Só quem pode ver a inscrição
+        (o próprio aluno ou o CCA) consegue baixar. Aceita Range e requisições
+        condicionais; em produção o envio pode ser delegado ao servidor web.
+        """
+        documento = self._documento_da_inscricao(documento_id)
+        if not documento.arquivo.storage.exists(documento.arquivo.name):
+            logger.error(f'Arquivo do documento {documento.pk} não encontrado: {documento.arquivo.name}')
+            raise Http404
+        return resposta_arquivo(
+            request,
+            documento.arquivo,
+            nome=documento.nome_original or os.path.basename(documento.arquivo.name),
+            content_type=documento.content_type,
+            etag=f'"{documento.sha256}"' if documento.sha256 else None,
+            modificado_em=documento.data_upload,
+        )
+
+    @action(detail=True, methods=['get'], url_path=r'documentos/(?P<documento_id>\d+)/preview')
+    def preview_documento(self, request, pk=None, documento_id=None):
+        """Miniatura JPEG do documento (gerada em segundo plano pelo comando 'gerar_previews')."""
+        documento = self._documento_da_inscricao(documento_id)
+        conteudo = documento.conteudo
+        if conteudo is None or not conteudo.preview:
+            raise Http404
+        return resposta_arquivo(
+            request,
+            conteudo.preview,
+            nome=f'{os.path.splitext(documento.nome_original or conteudo.sha256)[0]}.jpg',
+            content_type='image/jpeg',
+            etag=f'"{conteudo.sha256}-preview"',
+            modificado_em=documento.data_upload,
+            anexo=False,
+        )
+
+    def _documento_da_inscricao(self, documento_id):
+        """Documento de uma inscrição que o usuário pode ver (404 caso contrário)."""
+        inscricao = self.get_object()
+        documento = next((d for d in inscricao.documentos.all() if d.pk == int(documento_id)), None)
+        if documento is None or not documento.arquivo:
+            raise Http404
+        return documento
+
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        CCA exporta as inscrições (ex.: ?curso_id=5) com os dados do aluno.
+        '?formato=csv' (padrão) ou 'xlsx'. As linhas vêm do banco em blocos
+        (cursor no servidor) e são enviadas conforme ficam prontas.
+        """
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in ('csv', 'xlsx'):
+            return Response({'error': 'Formato inválido. Use "csv" ou "xlsx".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        colunas = {
+            'id': 'Inscrição',
+            'data_inscricao': 'Data da Inscrição',
+            'status': 'Status',
+            'tipo_vaga': 'Tipo de Vaga',
+            'matricula': 'Matrícula',
+            'curso__nome': 'Curso',
+            'aluno__user__first_name': 'Nome',
+            'aluno__user__last_name': 'Sobrenome',
+            'aluno__user__email': 'E-mail',
+            'aluno__cpf': 'CPF',
+            'aluno__data_nascimento': 'Data de Nascimento',
+            'aluno__telefone_celular': 'Celular',
+            'aluno__cidade__nome': 'Cidade',
+            'aluno__cidade__estado__uf': 'UF',
+        }
+        linhas_banco = (
+            self.get_queryset().select_related(None).prefetch_related(None)
+            .order_by('data_inscricao', 'id')
+            .values_list(*colunas)
+            .iterator(chunk_size=2000)
+        )
+        nomes_status = dict(InscricaoAluno.StatusInscricao.choices)
+        nomes_vaga = dict(InscricaoAluno.TipoVaga.choices)
+
+        def linhas():
+            for linha in linhas_banco:
+                linha = list(linha)
+                linha[1] = timezone.localtime(linha[1]).strftime('%d/%m/%Y %H:%M')
+                linha[2] = nomes_status.get(linha[2], linha[2])
+                linha[3] = nomes_vaga.get(linha[3], linha[3])
+                linha[10] = linha[10].strftime('%d/%m/%Y') if linha[10] else ''
+                yield linha
+
+        curso_id = request.query_params.get('curso_id')
+        nome = f"inscricoes{f'_curso_{curso_id}' if curso_id else ''}_{timezone.localdate():%Y%m%d}"
+        if formato == 'xlsx':
+            resposta = StreamingHttpResponse(
+                gerar_xlsx(list(colunas.values()), linhas(), 'Inscrições'),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+        else:
+            resposta = StreamingHttpResponse(
+                gerar_csv(list(colunas.values()), linhas()), content_type='text/csv; charset=utf-8'
+            )
+        resposta['Content-Disposition'] = content_disposition_header(True, f'{nome}.{formato}')
+        return resposta
+
+    @action(detail=False, methods=['get'], url_path='documentos-zip')
+    def documentos_zip(self, request):
+        """
+        CCA baixa, em um único ZIP, todos os documentos das inscrições de um
+        curso (?curso_id=5), com uma pasta por aluno. O ZIP é montado enquanto
+        é enviado: cada arquivo é lido em blocos e nada fica inteiro na memória.
+        """
+        curso_id = request.query_params.get('curso_id')
+        if not curso_id or not curso_id.isdigit():
+            return Response({'error': 'Informe o curso em "curso_id".'}, status=status.HTTP_400_BAD_REQUEST)
+        curso = Curso.objects.filter(pk=curso_id).only('nome').first()
+        if curso is None:
+            raise Http404
+
+        documentos = (
+            Documento.objects
+            .filter(inscricao__in=self.get_queryset().select_related(None).prefetch_related(None).values('pk'))
+            .order_by('inscricao__aluno__user__first_name', 'inscricao__aluno__user__last_name', 'inscricao_id', 'id')
+            .values_list(
+                'arquivo', 'nome_original', 'inscricao_id',
+                'inscricao__aluno__user__first_name', 'inscricao__aluno__user__last_name',
+            )
+            .iterator(chunk_size=500)
+        )
+
+        def entradas():
+            usados = set()
+            ausentes = []
+            for caminho, nome_original, inscricao_id, nome, sobrenome in documentos:
+                pasta = nome_seguro(f"{f'{nome} {sobrenome}'.strip() or 'Aluno'} - inscrição {inscricao_id}")
+                base, extensao = os.path.splitext(nome_seguro(nome_original or os.path.basename(caminho)))
+                nome_zip, repeticao = f'{pasta}/{base}{extensao}', 1
+                while nome_zip in usados:
+                    repeticao += 1
+                    nome_zip = f'{pasta}/{base} ({repeticao}){extensao}'
+                usados.add(nome_zip)
+                try:
+                    arquivo = default_storage.open(caminho, 'rb')
+                except FileNotFoundError:
+                    ausentes.append(nome_zip)
+                    continue
+                # Digitalizações (PDF/JPEG) já são comprimidas: armazenar sem compressão poupa CPU
+                yield nome_zip, self._blocos_arquivo(arquivo), False
+            if ausentes:
+                lista = 'Arquivos não encontrados no servidor:\n' + '\n'.join(ausentes) + '\n'
+                yield 'ARQUIVOS_AUSENTES.txt', [lista.encode('utf-8')], True
+
+        resposta = StreamingHttpResponse(gerar_zip(entradas()), content_type='application/zip')
+        resposta['Content-Disposition'] = content_disposition_header(
+            True, f'documentos_{nome_seguro(curso.nome, "curso")}.zip'
+        )
+        return resposta
+
+    @staticmethod
+    def _blocos_arquivo(arquivo):
+        with arquivo:
+            yield from arquivo.chunks()
 
     @action(detail=True, methods=['post'], url_path='validar',  parser_classes=[JSONParser] )
     def validar_inscricao(self, request, pk=None):
@@ -473,11 +732,77 @@ class InscricaoAlunoViewSet(viewsets.ModelViewSet):
         if aprovado is None:
             return Response({'error': 'O campo "aprovar" (true/false) é obrigatório.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        inscricao.status = 'CONFIRMADA' if aprovado else 'CANCELADA'
-        inscricao.save()
-        
-        # (Opcional) Enviar e-mail de notificação para o aluno aqui.
-        
+        # Mesma regra da validação em lote: recusar devolve a vaga para a lista de espera
+        novos_status, _ = validar_em_lote(InscricaoAluno.objects.filter(pk=inscricao.pk), {inscricao.pk: bool(aprovado)})
+        if inscricao.pk not in novos_status:
+            # Outra requisição decidiu (ou removeu) a inscrição entre a leitura e o UPDATE
+            return Response({'error': 'Esta inscrição não está mais aguardando validação.'}, status=status.HTTP_409_CONFLICT)
+        inscricao.refresh_from_db(fields=['status'])
+        # O aviso ao aluno sai pela fila de notificações (api/notificacoes.py)
+
         serializer = self.get_serializer(inscricao)
         return Response(serializer.data, status=status.HTTP_200_OK)
-    
\ No newline at end of file
+    
+
+    @action(detail=False, methods=['post'], url_path='validar-lote', parser_classes=[JSONParser])
+    def validar_lote(self, request):
+        """
+        CCA valida várias inscrições em uma única requisição/transação.
+        Corpo: {"decisoes": [{"id": 10, "aprovar": true}, {"id": 11, "aprovar": false}]}
+        Resposta: o resultado de cada id e as inscrições promovidas da lista de espera.
+        """
+        entrada = ValidacaoLoteSerializer(data=request.data)
+        entrada.is_valid(raise_exception=True)
+        decisoes = {decisao['id']: decisao['aprovar'] for decisao in entrada.validated_data['decisoes']}
+
+        novos_status, promovidos = validar_em_lote(self.get_queryset(), decisoes)
+
+        resultados = []
+        for pk in decisoes:
+            if pk in novos_status:
+                resultados.append({'id': pk, 'status': novos_status[pk]})
+            else:
+                resultados.append({'id': pk, 'erro': 'Inscrição não encontrada ou não está aguardando validação.'})
+        return Response(
+            {'resultados': resultados, 'promovidas_lista_espera': promovidos},
+            status=status.HTTP_200_OK,
+        )
+
+
+class RelatorioInscricoesView(APIView):
+    """
+    Relatório do CCA: demanda por curso, inscritos por estado/município/sexo e
+    taxa de aprovação por professor. Filtros opcionais pela data da inscrição:
+    ?de=2025-01-01&ate=2025-06-30. Agregado no banco e cacheado por filtro.
+    URL: /relatorios/inscricoes/
+    """
+    permission_classes = [IsCCAUser]
+
+    def get(self, request):
+        datas = {}
+        for parametro in ('de', 'ate'):
+            valor = request.query_params.get(parametro)
+            try:
+                datas[parametro] = parse_date(valor) if valor else None
+            except ValueError:
+                datas[parametro] = None
+            if valor and datas[parametro] is None:
+                return Response(
+                    {'error': f'Data inválida em "{parametro}". Use o formato AAAA-MM-DD.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        if datas['de'] and datas['ate'] and datas['de'] > datas['ate']:
+            return Response({'error': '"de" deve ser anterior a "ate".'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(relatorio_inscricoes(datas['de'], datas['ate']))
+
+
+class MetricasBancoView(APIView):
+    """
+    Ocupação das conexões com o banco (pool do processo e conexões abertas no
+    Postgres), para acompanhar picos de acesso como os dias de inscrição.
+    URL: /metricas/banco/
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(metricas_conexoes())
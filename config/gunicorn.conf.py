@@ -0,0 +1,45 @@
+"""
+Configuração do gunicorn para produção (CMD do Dockerfile):
+    gunicorn -c config/gunicorn.conf.py config.wsgi:application
+
+As views são síncronas (ORM, uploads e downloads em streaming), então o modelo
+é WSGI com workers 'gthread': processos para usar as CPUs e threads para não
+prender um processo inteiro enquanto uma requisição espera o banco ou a rede.
+Todos os valores podem ser ajustados por variáveis de ambiente.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Processos: 2 x CPUs + 1 (recomendação do gunicorn); threads por processo
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Carrega o Django uma vez no master antes do fork: os workers sobem mais
+# rápido e compartilham a memória das páginas não alteradas
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Worker sem dar sinal de vida por 'timeout' segundos é reiniciado; no
+# encerramento/reload, as requisições em andamento têm 'graceful_timeout' segundos
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recicla os workers aos poucos (com variação, para não reiniciarem todos juntos)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Heartbeat dos workers em memória (no Docker, /tmp pode ser overlay em disco)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Cada worker abre as próprias conexões com o banco (nada herdado do master pelo preload)."""
+    from django.db import connections
+    connections.close_all()
@@ -27,9 +27,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# O docker-compose (desenvolvimento) liga com DEBUG=True; a imagem roda com gunicorn e DEBUG desligado.
+DEBUG = os.getenv('DEBUG', 'False') == 'True'
 
-ALLOWED_HOSTS = []
+# Ex.: ALLOWED_HOSTS=fic.exemplo.edu.br,localhost
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',') if host.strip()]
 
 
 # Application definition
@@ -92,17 +94,78 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Conexões (métricas em /metricas/banco/):
+# - padrão: conexões persistentes, reaproveitadas por DB_CONN_MAX_AGE segundos por
+#   thread do gunicorn, testadas antes de reusar (DB_CONN_HEALTH_CHECKS);
+# - DB_POOL=True: pool nativo do Django 5 (psycopg 3 + psycopg_pool, ambos no
+#   requirements.txt), um pool por processo com até DB_POOL_MAX_SIZE conexões
+#   compartilhadas pelas threads. workers x DB_POOL_MAX_SIZE deve caber no
+#   max_connections do Postgres.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+if DB_POOL:
+    # Falha na inicialização, e não na primeira requisição, se a imagem não tiver o pool
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        from django.core.exceptions import ImproperlyConfigured
+        raise ImproperlyConfigured('DB_POOL=True requer o pacote "psycopg[binary,pool]" (ver requirements.txt).')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.getenv('POSTGRES_DB'),
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
-        'HOST': 'fic_db',
-        'PORT': '5432',
+        'HOST': os.getenv('POSTGRES_HOST', 'fic_db'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # O pool não aceita conexões persistentes: cada requisição devolve a conexão a ele
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'OPTIONS': {},
+    }
+}
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        # Segundos que uma requisição espera por uma conexão livre antes de dar erro
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'name': 'fic',
     }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# O cache em arquivo é compartilhado entre os workers e os comandos de manutenção
+# (ex.: import_data invalida os dados de referência).
+# 'referencia' guarda a versão dos dados de referência (da qual dependem as ETags e o
+# índice de municípios) separada do 'default': o FileBasedCache apaga entradas ao acaso
+# quando passa de MAX_ENTRIES, e o painel/relatórios enchem o 'default'. Aqui entram só
+# a versão e poucos conjuntos por versão, então o limite nunca é atingido.
+
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', '/app/cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': CACHE_LOCATION,
+    },
+    'referencia': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_LOCATION, 'referencia'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+    },
 }
 
+# Tempo (em segundos) que o navegador pode reutilizar estados, municípios e
+# opções de formulário sem revalidar a ETag.
+REFERENCIA_CACHE_MAX_AGE = int(os.getenv('REFERENCIA_CACHE_MAX_AGE', 86400))
+# Segundos que os dados de cada curso (e vagas restantes) ficam em cache no painel do aluno
+PAINEL_CACHE_SEGUNDOS = int(os.getenv('PAINEL_CACHE_SEGUNDOS', 15))
+# Segundos que cada relatório do CCA (por combinação de filtros) fica em cache
+RELATORIOS_CACHE_SEGUNDOS = int(os.getenv('RELATORIOS_CACHE_SEGUNDOS', 300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -146,6 +209,19 @@ STATIC_ROOT = '/app/static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads: os temporários ficam no mesmo disco da mídia, para o storage só renomear o arquivo
+DOCUMENTO_UPLOAD_TEMP_DIR = os.getenv('DOCUMENTO_UPLOAD_TEMP_DIR', str(MEDIA_ROOT / 'tmp'))
+DOCUMENTO_TAMANHO_MAXIMO = int(os.getenv('DOCUMENTO_TAMANHO_MAXIMO', 10 * 1024 * 1024))  # bytes por arquivo
+INSCRICAO_UPLOAD_MAXIMO = int(os.getenv('INSCRICAO_UPLOAD_MAXIMO', 30 * 1024 * 1024))  # bytes por inscrição
+
+# Download de documentos (api/downloads.py). A mídia não é servida publicamente:
+#   'django'           -> o próprio Django envia o arquivo (aceita Range);
+#   'x-accel-redirect' -> o nginx envia, a partir de um 'location internal' em DOCUMENTOS_ACCEL_PREFIXO
+#                         apontando para MEDIA_ROOT;
+#   'x-sendfile'       -> Apache (mod_xsendfile) ou lighttpd enviam pelo caminho absoluto.
+DOCUMENTOS_ENVIO = os.getenv('DOCUMENTOS_ENVIO', 'django')
+DOCUMENTOS_ACCEL_PREFIXO = os.getenv('DOCUMENTOS_ACCEL_PREFIXO', '/midia-protegida/')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGS_DIR = '/app/logs'
@@ -166,13 +242,19 @@ AUTH_USER_MODEL = 'api.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.roles.PapeisJWTAuthentication',
     ), 
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema'
+    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Paginação por cursor (keyset) em todas as listagens
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PadraoCursorPagination',
+    'PAGE_SIZE': 50,
 }
+# Em produção só JSON: a interface navegável do DRF renderiza HTML/formulários a cada resposta
+if not DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ('rest_framework.renderers.JSONRenderer',)
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "SistemaFIC",
@@ -204,17 +286,30 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializer.PapeisTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializer.PapeisTokenRefreshSerializer',
 }
 
+# Embute grupos e perfis (aluno/professor) no access token, evitando consultas
+# de papéis a cada requisição. Mudanças de grupo passam a valer no próximo refresh.
+JWT_PAPEIS_NO_TOKEN = os.getenv('JWT_PAPEIS_NO_TOKEN', 'False') == 'True'
+
+# Backend de envio. Para testes locais, use por exemplo:
+#   EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend
+#   EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend (grava em EMAIL_FILE_PATH)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', '/app/logs/emails')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 30))
+# Remetente quando EMAIL_HOST_USER não está definido
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'nao-responda@sistemafic.local')
+
 if DEBUG:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = 'mailhog'
     EMAIL_PORT = 1025
     EMAIL_USE_TLS = False
     EMAIL_HOST_USER = ''       
     EMAIL_HOST_PASSWORD = ''
 else:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = os.getenv('EMAIL_HOST')
     EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
     EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
@@ -222,6 +317,11 @@ else:
     EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
+# Caixa de saída (api/emails.py): os e-mails são enviados pelo comando 'enviar_emails'
+EMAIL_FILA_MAX_TENTATIVAS = int(os.getenv('EMAIL_FILA_MAX_TENTATIVAS', 5))
+EMAIL_FILA_ESPERA_MAXIMA = int(os.getenv('EMAIL_FILA_ESPERA_MAXIMA', 3600))  # segundos
+EMAIL_FILA_RESERVA = int(os.getenv('EMAIL_FILA_RESERVA', 300))  # segundos que um worker segura o lote
+
 #Tempo de expiração do token de reset password
 PASSWORD_RESET_TIMEOUT = 3600
 
@@ -13,7 +13,8 @@ from api.views import (
     PasswordResetConfirmView, PasswordResetRequestView, LogoutView,
     ProfessorViewSet, UserViewSet, CursoViewSet,
     InscricaoAlunoViewSet, MeView, FormOptionsView,
-    MunicipioViewSet, EstadoView, AlunoViewSet
+    MunicipioViewSet, EstadoView, AlunoViewSet, RelatorioInscricoesView,
+    MetricasBancoView
 )
 
 router = routers.DefaultRouter()
@@ -42,7 +43,13 @@ api_urlpatterns = [
     path('usuario/reset-password/', PasswordResetRequestView.as_view(), name='password-reset-request'),
     path('usuario/reset-password-confirm/<uidb64>/<token>/', PasswordResetConfirmView.as_view(), name='password-reset'),
     path('logout/', LogoutView.as_view(), name='auth_logout'),
-    path('estados/', EstadoView.as_view(), name='estados')
+    path('estados/', EstadoView.as_view(), name='estados'),
+
+    # Relatórios do CCA
+    path('relatorios/inscricoes/', RelatorioInscricoesView.as_view(), name='relatorio-inscricoes'),
+
+    # Monitoramento (administradores)
+    path('metricas/banco/', MetricasBancoView.as_view(), name='metricas-banco'),
 ]
 
 # --- Documentação com DRF Spectacular ---
@@ -55,6 +62,7 @@ urlpatterns = api_urlpatterns + [
     path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 # --- Servindo arquivos estáticos em modo DEBUG ---
+# A mídia (documentos dos alunos) NÃO é servida aqui: o download passa pela
+# checagem de permissão em /inscricoes-aluno/<id>/documentos/<id>/download/.
 if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file